@@ -0,0 +1,129 @@
+import importlib
+
+#-----------------Backends.py-----------------
+"""
+Registry of the solving backends used by GemHunter.
+How this module works:
+1. Every backend is described by a Backend object: its name, its number in the interactive menu, a description,
+   the module implementing it, the options it accepts (with their type) and a factory building a solver from that
+   module. main.py builds its --option flags from these options.
+2. The module is imported with importlib only when the backend is first used, so a run pays only for the solver
+   it chooses (PySAT, cdcl, ... are not imported by main.py).
+3. There are two kinds of backends:
+    - 'clauses': built from a list of clauses, solver.solve(stats, budget) returns a model or None,
+    - 'grid': built without argument, solver.run(grid, stats, budget) returns the solved rows of symbols or None.
+   Both set solver.status to STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN.
+4. A 'clauses' backend may name a `fallback` backend, which GemHunter runs when it gives up without an answer.
+5. Other backends can be added with register(); get() finds a backend by name or by number.
+"""
+
+class Backend:
+    def __init__(self, name: str, solve_id: int, module: str, description: str, kind: str, factory,
+                 options: dict = None, fallback: str = None):
+        """
+            - name / solve_id: how the backend is chosen (command line / interactive menu)
+            - module: name of the module imported on first use
+            - kind: 'clauses' or 'grid'
+            - factory: factory(module, clauses, options) -> solver (clauses is None for 'grid' backends)
+            - options: option name -> (type, description), the only options given to the factory
+            - fallback: name of the backend to run when this one gives up with STATUS_UNKNOWN
+        """
+        if kind not in ('clauses', 'grid'):
+            raise ValueError(f"unknown backend kind {kind!r}, expected 'clauses' or 'grid'")
+        self.name = name
+        self.solve_id = solve_id
+        self.module = module
+        self.description = description
+        self.kind = kind
+        self.factory = factory
+        self.options = options or {}
+        self.fallback = fallback
+
+    def load(self):
+        """import the module of the backend (only the first call does the work)"""
+        return importlib.import_module(self.module)
+
+    def create(self, clauses: list = None, options: dict = None):
+        """build a solver, unknown options raise a ValueError"""
+        options = options or {}
+        unknown = set(options) - set(self.options)
+        if unknown:
+            raise ValueError(f'backend {self.name!r} does not accept the options {sorted(unknown)}')
+        return self.factory(self.load(), clauses, options)
+
+
+_BACKENDS = {}  # name -> Backend, in order of registration
+
+
+def register(backend: Backend) -> Backend:
+    if backend.name in _BACKENDS or any(b.solve_id == backend.solve_id for b in _BACKENDS.values()):
+        raise ValueError(f'backend {backend.name!r} (number {backend.solve_id}) is already registered')
+    _BACKENDS[backend.name] = backend
+    return backend
+
+
+def get(key) -> Backend:
+    """backend by name (e.g. 'pysat') or by number (e.g. 1 or '1')"""
+    if key in _BACKENDS:
+        return _BACKENDS[key]
+    for backend in _BACKENDS.values():
+        if str(backend.solve_id) == str(key):
+            return backend
+    raise ValueError(f'unknown backend {key!r}, expected one of {names()}')
+
+
+def names() -> list:
+    return list(_BACKENDS)
+
+
+def options() -> dict:
+    """option name -> (type, description) of every backend, the first description wins for shared options"""
+    merged = {}
+    for backend in available():
+        for name, option in backend.options.items():
+            merged.setdefault(name, option)
+    return merged
+
+
+def available() -> list:
+    """every registered backend, in menu order"""
+    return sorted(_BACKENDS.values(), key=lambda backend: backend.solve_id)
+
+
+def _cdcl_solver(module, clauses, options):
+    workers = options.get('workers', 1)
+    if workers > 1:
+        if 'heuristic' in options:
+            raise ValueError('the heuristic cannot be chosen with more than 1 worker '
+                             '(cdcl.ParallelSolver gives every worker its own heuristic)')
+        return module.ParallelSolver(clauses, workers=workers, seed=options.get('seed') or 0)
+    return module.Solver(clauses, seed=options.get('seed'), heuristic=options.get('heuristic', 'random'))
+
+
+register(Backend(
+    'pysat', 1, 'PySAT', 'PySAT', 'clauses',
+    lambda module, clauses, options: module.PySatSolver(clauses, options.get('solver_name', 'g4')),
+    options={'solver_name': (str, 'PySAT solver (g4, g3, m22, etc), default g4')},
+))
+register(Backend(
+    'cdcl', 2, 'cdcl', 'CDCL (self implementation)', 'clauses', _cdcl_solver,
+    options={'seed': (int, 'random seed'), 'heuristic': (str, 'random, occurrence or ordered'),
+             'workers': (int, 'more than 1 runs a thread portfolio (cdcl.ParallelSolver)')},
+))
+register(Backend(
+    'backtracking', 3, 'BruteForce_Backtrack', 'Backtracking algorithm', 'grid',
+    lambda module, clauses, options: module.Backtracking(),
+))
+register(Backend(
+    'bruteforce', 4, 'BruteForce_Backtrack', 'Brute-force algorithm', 'grid',
+    lambda module, clauses, options: module.BruteForce(),
+))
+register(Backend(
+    'localsearch', 5, 'LocalSearch', 'Local search (probSAT, falls back to PySAT)', 'clauses',
+    lambda module, clauses, options: module.LocalSearchSolver(clauses, **options),
+    options={'algorithm': (str, 'probsat or walksat'), 'noise': (float, 'WalkSAT random walk probability'),
+             'cb': (float, 'probSAT break exponent'), 'max_flips': (int, 'flips per try'),
+             'max_tries': (int, 'number of tries'), 'true_probability': (float, 'initial probability of True'),
+             'seed': (int, 'random seed')},
+    fallback='pysat',
+))
@@ -0,0 +1,110 @@
+import struct
+import numpy as np
+from BoardParser import UNKNOWN, TRAP, GEM, parse_board, validate_grid, write_board
+
+#-----------------BoardBinary.py-----------------
+"""
+This module stores boards and solutions in a packed binary format, much smaller and faster than the text format.
+File format:
+1. A 16-byte header: magic b'GEMH', format version, kind (0 = board, 1 = solution), 2 padding bytes, n and m (uint32, little endian).
+2. Board payload: 4 bits per cell, two cells per byte (first cell in the high nibble), row-major.
+   Nibble values: 0-8 for numbers, 9 for '_', 10 for 'T', 11 for 'G'.
+3. Solution payload: 1 bit per cell (1 = trap), row-major, as produced by np.packbits.
+A solution only says where the traps are; apply_solution combines it with its board to get the solved board back.
+"""
+
+MAGIC = b'GEMH'
+VERSION = 1
+KIND_BOARD = 0
+KIND_SOLUTION = 1
+_HEADER = struct.Struct('<4sBBxxII')
+
+
+def _write(filepath: str, kind: int, shape: tuple, payload: bytes) -> None:
+    with open(filepath, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, kind, shape[0], shape[1]))
+        f.write(payload)
+
+
+def _read(filepath: str, kind: int) -> tuple:
+    """returns (n, m, payload as uint8 array) after checking the header"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f'{filepath}: truncated header')
+    magic, version, file_kind, n, m = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{filepath}: not a binary board file (version {VERSION})')
+    if file_kind != kind:
+        raise ValueError(f'{filepath}: expected a {"board" if kind == KIND_BOARD else "solution"} file')
+    return n, m, np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size)
+
+
+def is_binary(filepath: str) -> bool:
+    """Check whether a file starts with the binary format magic."""
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_board(filepath: str, grid: np.ndarray) -> None:
+    nibbles = np.where(grid >= 0, grid, 8 - grid.astype(np.int16)).astype(np.uint8).ravel()   # -1, -2, -3 -> 9, 10, 11
+    if len(nibbles) % 2:
+        nibbles = np.append(nibbles, np.uint8(0))
+    _write(filepath, KIND_BOARD, grid.shape, ((nibbles[0::2] << 4) | nibbles[1::2]).tobytes())
+
+
+def load_board(filepath: str) -> np.ndarray:
+    n, m, payload = _read(filepath, KIND_BOARD)
+    if len(payload) != (n * m + 1) // 2:
+        raise ValueError(f'{filepath}: payload size does not match a {n} x {m} board')
+    nibbles = np.empty(2 * len(payload), dtype=np.int8)
+    nibbles[0::2] = payload >> 4
+    nibbles[1::2] = payload & 0x0F
+    nibbles = nibbles[:n * m]
+    if np.any(nibbles > 11):
+        raise ValueError(f'{filepath}: invalid cell code')
+    grid = np.where(nibbles <= 8, nibbles, 8 - nibbles).astype(np.int8).reshape(n, m)
+    validate_grid(grid)  # same checks as a text board
+    return grid
+
+
+def save_solution(filepath: str, traps: np.ndarray) -> None:
+    """Save a boolean n x m trap mask."""
+    _write(filepath, KIND_SOLUTION, traps.shape, np.packbits(traps.ravel()).tobytes())
+
+
+def load_solution(filepath: str) -> np.ndarray:
+    """returns the boolean n x m trap mask of a solution file"""
+    n, m, payload = _read(filepath, KIND_SOLUTION)
+    if len(payload) != (n * m + 7) // 8:
+        raise ValueError(f'{filepath}: payload size does not match a {n} x {m} solution')
+    return np.unpackbits(payload, count=n * m).astype(bool).reshape(n, m)
+
+
+def apply_solution(grid: np.ndarray, traps: np.ndarray) -> np.ndarray:
+    """
+        build the solved board: every unknown cell becomes a trap where `traps` is set and a gem elsewhere,
+        the other cells are copied from `grid`
+    """
+    return np.where(grid == UNKNOWN, np.where(traps, TRAP, GEM), grid).astype(np.int8)
+
+
+def solution_mask(result: np.ndarray) -> np.ndarray:
+    """Trap mask of a solved board."""
+    return result == TRAP
+
+
+def text_to_binary(src: str, dst: str) -> None:
+    """Convert a text board (or a solved board) into a binary board file."""
+    save_board(dst, parse_board(src))
+
+
+def binary_to_text(src: str, dst: str, board: str = None) -> None:
+    """
+        Convert a binary file back into the text format.
+        A solution file needs the binary board it solves (`board`) and is written as the solved board.
+    """
+    if board is None:
+        write_board(dst, load_board(src))
+    else:
+        write_board(dst, apply_solution(load_board(board), load_solution(src)))
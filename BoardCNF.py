@@ -1,10 +1,12 @@
 import copy
+import numpy as np
+from BoardParser import UNKNOWN, TRAP, grid_from_rows
 
 #-----------------BoardCNF.py-----------------
 """
 This class provides a way to encode the Gem Hunter puzzle as a CNF formula and generate the clauses needed to solve the puzzle using a SAT solver.
 How this class works:
-1. The main_board attribute is a 2D list that contains the current board.
+1. The main_board attribute is a 2D list of cell codes (see BoardParser) built from the parsed board grid.
 2. The n and m attributes store the number of rows and columns in the board.
 3. The id_board attribute is a 2D list that stores the unique identifier for each cell in the board.
 4. The marked_board attribute is a 2D list that keeps track of which cells have been marked as traps.
@@ -13,37 +15,74 @@ How this class works:
 7. The gen_combine method generates all possible combinations of trap cells given the number of traps and their positions.
 8. The add_cells_clauses method adds clauses for each cell that contains a number.
 9. The gen_clauses method generates the CNF clauses from the current board.
+10. The trap_mask method decodes a model back into a boolean n x m grid (True = trap).
+Encodings:
+- 'full': every cell gets the variable i * m + j + 1; number cells and unconstrained unknown cells are pinned false by unit clauses.
+- 'dense': only unknown cells next to a number get a variable (numbered 1, 2, ... in order of first use, see var_cells);
+  number cells and unconstrained cells get no variable nor clause (unconstrained cells decode as gems),
+  identical neighbourhood constraints are encoded once, duplicate clauses are dropped and clauses subsumed by a unit clause are removed.
 """
 
+ENCODINGS = ('full', 'dense')
+
 class BoardCNF:
-    def __init__(self, board: list, n: int, m: int):
-        self.main_board = []
-        for row in board:
-            m_row = []
-            for item in row:
-                if '0' <= item <= '9':
-                    m_row.append(int(item)) # Convert string to int
-                else:
-                    m_row.append(item)
-            self.main_board.append(m_row)
+    def __init__(self, board: np.ndarray, n: int, m: int, encoding: str = 'full'):
+        if encoding not in ENCODINGS:
+            raise ValueError(f'unknown encoding {encoding!r}, expected one of {ENCODINGS}')
+        self.main_board = self.as_grid(board).tolist() # Plain lists are faster than NumPy for cell-by-cell access
         self.n = n # Number of rows
         self.m = m # Number of columns
+        self.encoding = encoding
         self.id_board = [[0] * m for i in range(n)]
         self.marked_board = copy.deepcopy(self.id_board)
         self.result_clauses = []
-        for i in range(0, n):
-            for j in range(0, m):
-                self.id_board[i][j] = i * m + j + 1 # Assign a unique identifier to each cell (from 1 to n*m)
+        self.var_cells = []  # dense encoding: (row, col) of variable v at index v - 1
+        self._seen_constraints = set()  # dense encoding: (cells, number of traps) already encoded
+        self._seen_clauses = set()  # dense encoding: clauses already generated, as sorted tuples
+        self._units = set()  # dense encoding: literals of the unit clauses
+        if encoding == 'full':
+            for i in range(0, n):
+                for j in range(0, m):
+                    self.id_board[i][j] = i * m + j + 1 # Assign a unique identifier to each cell (from 1 to n*m)
+
+    @property
+    def num_vars(self) -> int:
+        return self.n * self.m if self.encoding == 'full' else len(self.var_cells)
+
+    def cell_id(self, row: int, col: int) -> int:
+        """Variable of an unknown cell, allocated on first use in the dense encoding."""
+        var = self.id_board[row][col]
+        if var == 0:
+            self.var_cells.append((row, col))
+            var = self.id_board[row][col] = len(self.var_cells)
+        return var
+
+    @staticmethod
+    def as_grid(board) -> np.ndarray:
+        """Accept a parsed grid or a list of rows of symbols."""
+        if isinstance(board, np.ndarray):
+            return board
+        return grid_from_rows(board)
 
-    def update_board(self, board: list):
+    def update_board(self, board):
         """ Update current main board to a new board."""
-        self.main_board = copy.deepcopy(board)
-        self.result_clauses = self.gen_clauses()
+        self.main_board = self.as_grid(board).tolist()
+        self.marked_board = [[0] * self.m for i in range(self.n)]
+        self.result_clauses = []
+        if self.encoding == 'dense':
+            self.id_board = [[0] * self.m for i in range(self.n)]
+            self.var_cells = []
+            self._seen_constraints.clear()
+            self._seen_clauses.clear()
+            self._units.clear()
+        self.gen_clauses()
 
     @staticmethod
     def gen_combine(num_trap_cells: int, pos_trap_cells: list) -> list:
         """Generate all possible combinations of num_trap_cells in pos_trap_cells."""
         import itertools
+        if not 0 <= num_trap_cells <= len(pos_trap_cells):
+            return [[]] # The number cannot be satisfied: the empty clause makes the formula unsatisfiable
         greater_equal = list(itertools.combinations(pos_trap_cells, len(pos_trap_cells) - num_trap_cells + 1)) # pos_trap_cells - num_trap_cells <= 1
         lower_equal = list(itertools.combinations(pos_trap_cells, num_trap_cells + 1))  # pos_trap_cells - num_trap_cells >= 1 
         combinations_clause = []
@@ -65,24 +104,62 @@ class BoardCNF:
                 x = row + delta_row # Neighbor row
                 y = col + delta_col # Neighbor column
                 if 0 <= x < self.n and 0 <= y < self.m:
-                    if self.main_board[x][y] == '_':
-                        pos_trap_cells.append(self.id_board[x][y]) # Add the neighbor cell to pos_trap_cells
+                    if self.main_board[x][y] == UNKNOWN:
+                        pos_trap_cells.append(self.cell_id(x, y)) # Add the neighbor cell to pos_trap_cells
                         self.marked_board[x][y] = 1 # Mark the neighbor cell
-                    elif self.main_board[x][y] == 'T': # If the neighbor cell is a trap
+                    elif self.main_board[x][y] == TRAP: # If the neighbor cell is a trap
                         num_trap_cells -= 1 # Decrement the number of traps
+        if self.encoding == 'dense':
+            self.add_dense_clauses(num_trap_cells, pos_trap_cells)
+            return
         clauses = self.gen_combine(num_trap_cells, pos_trap_cells)
         self.result_clauses.append([self.id_board[row][col] * -1]) 
         for clause in clauses:
             self.result_clauses.append(clause)
 
+    def add_dense_clauses(self, num_trap_cells: int, pos_trap_cells: list) -> None:
+        """Add the clauses of one number cell, skipping repeated constraints, duplicate clauses and clauses subsumed by a unit."""
+        key = (tuple(sorted(pos_trap_cells)), num_trap_cells)
+        if key in self._seen_constraints:
+            return
+        self._seen_constraints.add(key)
+        for clause in self.gen_combine(num_trap_cells, pos_trap_cells):
+            sorted_clause = tuple(sorted(clause))
+            if sorted_clause in self._seen_clauses:
+                continue
+            if len(clause) != 1 and any(lit in self._units for lit in clause):
+                continue
+            self._seen_clauses.add(sorted_clause)
+            if len(clause) == 1:
+                self._units.add(clause[0])
+            self.result_clauses.append(clause)
+
     def gen_clauses(self) -> list:
         """Gen clauses using current main board and return a list that contains all the clauses."""
         for i in range(0, self.n):
             for j in range(0, self.m):
-                if type(self.main_board[i][j]) is int: 
+                if self.main_board[i][j] >= 0: # Number cell
                     self.add_cells_clauses(i, j)
+        if self.encoding == 'dense':
+            # drop the clauses generated before a unit clause that subsumes them
+            self.result_clauses = [clause for clause in self.result_clauses
+                                   if len(clause) == 1 or not any(lit in self._units for lit in clause)]
+            return self.result_clauses
         for i in range(0, self.n):
             for j in range(0, self.m):
-                if self.main_board[i][j] == '_' and self.marked_board[i][j] == 0:
+                if self.main_board[i][j] == UNKNOWN and self.marked_board[i][j] == 0:
                     self.result_clauses.append([self.id_board[i][j] * -1]) # self.id_board[i][j] * -1 is the negation of the cell
         return self.result_clauses
+
+    def trap_mask(self, model: list) -> np.ndarray:
+        """Decode a model (list of literals) into a boolean n x m grid, True where the cell is a trap."""
+        model = np.asarray(model, dtype=np.int64)
+        values = np.zeros(self.num_vars + 1, dtype=bool)
+        values[model[(model > 0) & (model <= self.num_vars)]] = True
+        if self.encoding == 'full':
+            return values[1:].reshape(self.n, self.m)   # variable i * m + j + 1 is the cell (i, j)
+        mask = np.zeros((self.n, self.m), dtype=bool)
+        if self.var_cells:
+            rows, cols = np.array(self.var_cells).T
+            mask[rows, cols] = values[1:]
+        return mask
@@ -0,0 +1,162 @@
+import mmap
+import numpy as np
+
+#-----------------BoardParser.py-----------------
+"""
+This module reads a Gem Hunter board file into a compact NumPy grid that is shared by every solver.
+How this module works:
+1. The file is memory-mapped and read row by row, so huge boards never go through readlines() or a list of strings.
+2. Each row is decoded straight from its bytes: blanks are dropped, the remaining bytes must alternate cell, ',', cell, ...
+   and every cell byte is mapped to its code through a 256-entry lookup table.
+3. The grid has dtype int8: numbers keep their value (0-8), the other symbols use the negative codes below.
+4. The input is validated up front (unknown symbols, numbers > 8, ragged rows, numbers larger than the amount of
+   neighbours of their cell), a ValueError tells the line and column of the first bad cell.
+"""
+
+UNKNOWN = -1    # '_': can be a trap or a gem
+TRAP = -2       # 'T'
+GEM = -3        # 'G'
+INVALID = -128  # any byte that is not a cell symbol
+
+_LOOKUP = np.full(256, INVALID, dtype=np.int8)
+_LOOKUP[ord('0'):ord('9')] = np.arange(9, dtype=np.int8)    # '0'..'8'
+_LOOKUP[ord('_')] = UNKNOWN
+_LOOKUP[ord('T')] = TRAP
+_LOOKUP[ord('G')] = GEM
+
+_BLANKS = np.array([ord(' '), ord('\t'), ord('\r'), ord('\n')], dtype=np.uint8)
+_COMMA = ord(',')
+
+# symbol of each cell code, indexed by (code + 3): GEM, TRAP, UNKNOWN, 0..8
+_SYMBOLS = np.array(['G', 'T', '_'] + [str(i) for i in range(9)])
+_CHAR_CODES = np.frombuffer(''.join(_SYMBOLS.tolist()).encode(), dtype=np.uint8)   # ASCII byte of each symbol
+
+
+def _decode_row(line: bytes, line_no: int) -> np.ndarray:
+    """Decode one line of the file into an int8 array of cell codes."""
+    raw = np.frombuffer(line, dtype=np.uint8)
+    chars = raw[~np.isin(raw, _BLANKS)]
+    if len(chars) % 2 == 0 or np.any(chars[1::2] != _COMMA):
+        raise ValueError(f'line {line_no}: malformed row, cells must be single symbols separated by ", "')
+    row = _LOOKUP[chars[0::2]]
+    bad = np.flatnonzero(row == INVALID)
+    if len(bad) > 0:
+        col = bad[0]
+        raise ValueError(f'line {line_no}, column {col + 1}: invalid cell {chr(chars[2 * col])!r} '
+                         f'(expected 0-8, _, T or G)')
+    return row
+
+
+def _lines(f):
+    """lines of an open binary file, through mmap when the file can be mapped (pipes cannot)"""
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # mmap refuses empty files
+        return
+    except OSError:     # not a regular file, e.g. standard input
+        yield from f
+        return
+    with mm:
+        yield from iter(mm.readline, b'')
+
+
+def iter_rows(filepath: str):
+    """
+        yield the rows of the board file one at a time as int8 arrays, reading the file through mmap.
+        Every row is checked on its own (symbols and width); empty lines are skipped.
+    """
+    with open(filepath, 'rb') as f:
+        width = None
+        for line_no, line in enumerate(_lines(f), 1):
+            if not line.strip():
+                continue
+            row = _decode_row(line, line_no)
+            if width is None:
+                width = len(row)
+            elif len(row) != width:
+                raise ValueError(f'line {line_no}: expected {width} cells, found {len(row)}')
+            yield row
+
+
+def _spans(k: int) -> np.ndarray:
+    """Number of in-bound cells among (i - 1, i, i + 1) for every index i of an axis of length k."""
+    spans = np.full(k, 3, dtype=np.int8)
+    spans[[0, -1]] -= 1
+    if k == 1:
+        spans[:] = 1
+    return spans
+
+
+def neighbour_counts(n: int, m: int) -> np.ndarray:
+    """Number of in-bound neighbours of every cell of a n x m board (3 in corners, 5 on borders, 8 inside)."""
+    return np.outer(_spans(n), _spans(m)).astype(np.int8) - 1
+
+
+def _too_big_error(i: int, j: int, value: int) -> ValueError:
+    return ValueError(f'line {i + 1}, column {j + 1}: {value} traps cannot fit around this cell')
+
+
+def validate_grid(grid: np.ndarray) -> None:
+    """Raise a ValueError if a number is larger than the amount of neighbours of its cell."""
+    too_big = grid > neighbour_counts(*grid.shape)
+    if np.any(too_big):
+        i, j = np.argwhere(too_big)[0]
+        raise _too_big_error(i, j, grid[i, j])
+
+
+def validate_row(row: np.ndarray, index: int, first: bool, last: bool) -> None:
+    """
+        validate_grid for one row of a streamed board: `index` is the row number (from 0),
+        `first` / `last` tell whether the row is the first / last of the board
+    """
+    height = 1 + (not first) + (not last)   # rows of the neighbourhood inside the board
+    too_big = row > height * _spans(len(row)) - 1
+    if np.any(too_big):
+        j = np.flatnonzero(too_big)[0]
+        raise _too_big_error(index, j, row[j])
+
+
+def parse_board(filepath: str) -> np.ndarray:
+    """
+        read and validate a board file
+        returns a n x m int8 grid of cell codes (0-8, UNKNOWN, TRAP or GEM)
+    """
+    rows = list(iter_rows(filepath))
+    if not rows:
+        raise ValueError(f'{filepath}: the board is empty')
+    grid = np.vstack(rows)
+    validate_grid(grid)
+    return grid
+
+
+def grid_from_rows(rows: list) -> np.ndarray:
+    """Convert a board given as a list of rows of symbols (e.g. [['3', '_'], ['_', '1']]) into a grid."""
+    grid = np.array([[_LOOKUP[ord(cell)] if len(cell) == 1 else INVALID for cell in map(str, row)] for row in rows],
+                    dtype=np.int8)
+    if np.any(grid == INVALID):
+        raise ValueError('invalid cell symbol in board')
+    return grid
+
+
+def grid_to_rows(grid: np.ndarray) -> list:
+    """Convert a grid back into a list of rows of symbols."""
+    return _SYMBOLS[grid.astype(np.int16) + 3].tolist()
+
+
+def format_board(grid: np.ndarray) -> bytes:
+    """
+        render a grid in the text format ("3, T, 2, G" rows ending with a newline), built as one byte array
+    """
+    n, m = grid.shape
+    out = np.empty((n, 3 * m), dtype=np.uint8)
+    out[:, 0::3] = _CHAR_CODES[grid.astype(np.int16) + 3]
+    out[:, 1::3] = _COMMA
+    out[:, 2::3] = ord(' ')
+    out[:, 3 * m - 2] = ord('\n')
+    return out[:, :3 * m - 1].tobytes()
+
+
+def write_board(filepath: str, grid: np.ndarray) -> None:
+    """Write a grid to a text board file."""
+    with open(filepath, 'wb') as f:
+        f.write(format_board(grid))
@@ -1,24 +1,36 @@
 import itertools
 import time
+import numpy as np
+import Verifier
+from BoardParser import parse_board, grid_from_rows, grid_to_rows, UNKNOWN, TRAP
+from Instrumentation import NULL_STATS
+from Budget import UNLIMITED, BudgetExceeded, STATUS_SAT, STATUS_UNSAT, STATUS_UNKNOWN
 
 # Brute Force
 class BruteForce:
+    BATCH_CELLS = 1 << 20  # candidates are checked in batches of about this many cells (batch size x board size)
+
     def __init__(self):
         self.board = []
+        self.grid = None  # the board as a grid of cell codes, for the Verifier
         self.n = 0  # Number of rows
         self.m = 0  # Number of columns
+        self.candidates = 0  # Number of candidate solutions checked by the last solve
+        self.status = None  # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN (budget exceeded) after run()
 
     def gen_board(self, filepath):
         """
         this function get in the filepath and return the generated board
         """
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                row = line.strip().split(', ')
-                self.board.append(row)
-                self.n += 1  # Number of rows
-                self.m = len(row)  # Number of columns
+        self.load_board(parse_board(filepath))
+
+    def load_board(self, grid):
+        """
+        load a grid produced by BoardParser.parse_board, cells are kept as their symbols
+        """
+        self.grid = grid
+        self.board = grid_to_rows(grid)
+        self.n, self.m = grid.shape
 
     def has_number_neighbor(self, i, j):
         """
@@ -37,58 +49,61 @@ class BruteForce:
         return False
 
     def is_valid_solution(self, solution):
-        for i in range(self.n):
-            for j in range(self.m):
-                if self.board[i][j].isdigit():
-                    count = 0
-                    for di, dj in itertools.product([-1, 0, 1], repeat=2):
-                        if di == dj == 0:
-                            continue
-                        ni, nj = i + di, j + dj
-                        if 0 <= ni < self.n and 0 <= nj < self.m and solution[ni][nj] == 'T':
-                            count += 1
-                    if count != int(self.board[i][j]):
-                        return False
-        return True
+        return Verifier.verify(self.grid, grid_from_rows(solution))
 
-    def brute_force_solve(self):
+    def brute_force_solve(self, budget=UNLIMITED):
         """
-        solve the problem using brute force
+        solve the problem using brute force, every candidate counts as a node of the budget
+        only the empty cells next to a number are enumerated (the others do not change any count and end up as gems),
+        and the candidates are checked by batches with Verifier.verify_batch
         return the runtime and the solution
+        raise BudgetExceeded when the budget runs out
         """
 
         start_time = time.time()
-        # Generate all possible combinations of Trap and Gem for the empty cells
-        # and check if the solution is valid
-        for trap_gems in itertools.product(['T', 'G'], repeat=sum(cell == '_' for row in self.board for cell in row)):
-            solution = [['_' for _ in range(self.m)] for _ in range(self.n)]
-            trap_gem_index = 0
-            for i in range(self.n):
-                for j in range(self.m):
-                    if self.board[i][j] == '_':
-                        solution[i][j] = trap_gems[trap_gem_index]
-                        trap_gem_index += 1
-                    else:
-                        solution[i][j] = self.board[i][j]
-
-            if self.is_valid_solution(solution):
+        self.candidates = 0
+        budget.start()
+        constrained = (self.grid == UNKNOWN) & (Verifier.neighbour_traps(self.grid >= 0) > 0)
+        rows, cols = np.nonzero(constrained)
+        k = len(rows)
+        batch = max(1, min(1 << k, self.BATCH_CELLS // (self.n * self.m)))
+        # candidate c gives cell p the (k-1-p)-th bit of c, 0 for a trap: the order of itertools.product(['T', 'G'])
+        shifts = np.arange(k - 1, -1, -1, dtype=np.int64)
+        base = self.grid == TRAP
+        for first in range(0, 1 << k, batch):
+            indices = np.arange(first, min(first + batch, 1 << k), dtype=np.int64)
+            traps = np.repeat(base[np.newaxis], len(indices), axis=0)
+            traps[:, rows, cols] = (indices[:, np.newaxis] >> shifts) & 1 == 0
+            valid = np.flatnonzero(Verifier.verify_batch(self.grid, traps))
+            self.candidates += len(indices) if len(valid) == 0 else int(valid[0]) + 1
+            budget.check(nodes=self.candidates)
+            if len(valid):
+                solution = [row[:] for row in self.board]
+                for i, j in np.argwhere(self.grid == UNKNOWN).tolist():
+                    solution[i][j] = 'T' if traps[valid[0], i, j] else 'G'
                 end_time = time.time()
                 return (end_time - start_time), solution
         return None, None
-    
+
     def final_solution(self, run_time, solution):
         # print('Solution found in {:.4f} seconds:'.format(run_time))
-        # Modify the solution for cells with no number neighbors
-        for i in range(self.n):
-            for j in range(self.m):
-                if solution[i][j] == 'T' and not self.has_number_neighbor(i, j):
-                    solution[i][j] = 'G'
-        
+        # Cells with no number neighbors are already gems: brute_force_solve only enumerates the constrained cells
+        # (revealed traps are kept as they are)
         return solution
 
-    def run(self, filePath):
-        self.gen_board(filePath)
-        run_time, solution = self.brute_force_solve()
+    def run(self, grid, stats=NULL_STATS, budget=UNLIMITED):
+        self.load_board(grid)
+        try:
+            run_time, solution = self.brute_force_solve(budget)
+        except BudgetExceeded:
+            run_time, solution = None, None
+            self.status = STATUS_UNKNOWN
+        else:
+            self.status = STATUS_UNSAT if solution is None else STATUS_SAT
+        stats.count('candidates', self.candidates)
+        if solution is None:
+            return None
+        stats.record('search', run_time)
         return self.final_solution(run_time, solution)
 
 # Backtracking
@@ -97,19 +112,25 @@ class Backtracking:
         self.board = []
         self.n = 0  # Number of rows
         self.m = 0  # Number of columns
+        self.nodes = 0  # Number of search nodes visited by the last solve
+        self.budget = UNLIMITED  # Budget of the current solve
+        self.status = None  # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN (budget exceeded) after run()
 
     def gen_board(self, filepath):
         """
         this function get in the filepath and return the generated board with not number cell assigned to None
-        print the input board
         """
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                row = [None if x.strip() == '_' else int(x.strip()) for x in line.strip().split(',')]
-                self.board.append(row)
-                self.n += 1  # Number of rows
-                self.m = len(row)  # Number of columns
+        self.load_board(parse_board(filepath))
+
+    def load_board(self, grid):
+        """
+        load a grid produced by BoardParser.parse_board, unknown cells are assigned to None
+        and revealed traps/gems are kept as their symbols 'T'/'G'
+        """
+        symbols = grid_to_rows(grid)
+        self.board = [[None if cell == UNKNOWN else (cell if cell >= 0 else symbols[i][j]) for j, cell in enumerate(row)]
+                      for i, row in enumerate(grid.tolist())]
+        self.n, self.m = grid.shape
 
     def get_neighbors(self, i, j):
         """
@@ -131,8 +152,11 @@ class Backtracking:
             if isinstance(self.board[ni][nj], int):
                 expected_traps = self.board[ni][nj]
                 neighbors = self.get_neighbors(ni, nj)
-                count = sum(temp_assignments.get((nii, nij), False) for nii, nij in neighbors)
-                if count > expected_traps or (all((nii, nij) in temp_assignments for nii, nij in neighbors) and count != expected_traps):
+                # only unknown cells are ever assigned, revealed traps count as traps
+                unknown = [(nii, nij) for nii, nij in neighbors if self.board[nii][nij] is None]
+                count = (sum(temp_assignments.get(cell, False) for cell in unknown)
+                         + sum(self.board[nii][nij] == 'T' for nii, nij in neighbors))
+                if count > expected_traps or (all(cell in temp_assignments for cell in unknown) and count != expected_traps):
                     return False
         return True
 
@@ -142,6 +166,8 @@ class Backtracking:
         get in: assignments: the current assignments
         return: True if the solution is found, False otherwise
         """
+        self.nodes += 1
+        self.budget.check(nodes=self.nodes)
         if len(assignments) == sum(1 for row in self.board for cell in row if cell is None):
             return True # solution found
 
@@ -158,51 +184,68 @@ class Backtracking:
                 del assignments[(i, j)]
         return False
 
-    def solve(self):
+    def solve(self, budget=UNLIMITED):
+        """
+        run the backtracking search within `budget` (nodes are counted by backtrack calls)
+        return the runtime and the assignments; (None, None) if there is no solution or the budget runs out
+        """
         start_time = time.time()
+        self.nodes = 0
+        self.budget = budget.start()
         assignments = {}
-        if self.backtrack(assignments):
+        try:
+            found = self.backtrack(assignments)
+        except BudgetExceeded:
+            self.status = STATUS_UNKNOWN
+            return None, None
+        finally:
+            self.budget = UNLIMITED
+        if found:
             end_time = time.time()
+            self.status = STATUS_SAT
             return (end_time - start_time), assignments
+        self.status = STATUS_UNSAT
         return None, None
 
     def final_solution(self, run_time, solution):
-        if solution:
-            # print('Solution found in {:.4f} seconds:'.format(run_time))
-            final_output = [['_' for _ in range(self.m)] for _ in range(self.n)]
-
-            # Fill the solution into the final output
-            for i, row in enumerate(self.board):
-                for j, cell in enumerate(row):
-                    if cell is None:
-                        final_output[i][j] = 'T' if solution.get((i, j), False) else 'G'
-                    else:
-                        final_output[i][j] = str(cell)
-
-            # Check for cells with no number neighbors and adjust if necessary
-            for row in range(self.n):
-                for col in range(self.m):
-                    if self.board[row][col] is None:
-                        has_number_neighbor = any(isinstance(self.board[ni][nj], int) for ni, nj in self.get_neighbors(row, col))
-                        if not has_number_neighbor:
-                            final_output[row][col] = 'G'  # Ensure cells with no number neighbors are Gems
+        if solution is None:
+            return None
+        # print('Solution found in {:.4f} seconds:'.format(run_time))
+        final_output = [['_' for _ in range(self.m)] for _ in range(self.n)]
+
+        # Fill the solution into the final output
+        for i, row in enumerate(self.board):
+            for j, cell in enumerate(row):
+                if cell is None:
+                    final_output[i][j] = 'T' if solution.get((i, j), False) else 'G'
+                else:
+                    final_output[i][j] = str(cell)
+
+        # Check for cells with no number neighbors and adjust if necessary
+        for row in range(self.n):
+            for col in range(self.m):
+                if self.board[row][col] is None:
+                    has_number_neighbor = any(isinstance(self.board[ni][nj], int) for ni, nj in self.get_neighbors(row, col))
+                    if not has_number_neighbor:
+                        final_output[row][col] = 'G'  # Ensure cells with no number neighbors are Gems
         return final_output
     
-    def run(self, filePath):
-        self.gen_board(filePath)
-        run_time, solution = self.solve()
+    def run(self, grid, stats=NULL_STATS, budget=UNLIMITED):
+        self.load_board(grid)
+        run_time, solution = self.solve(budget)
+        stats.count('nodes', self.nodes)
+        if run_time is not None:
+            stats.record('search', run_time)
         return self.final_solution(run_time, solution)
 
 
 if __name__ == '__main__':
-    backtracking = Backtracking()
-    brute_force = BruteForce()
+    grid = parse_board('testcases/test4.txt')
 
     print('Backtracking:')
-    run_time, solution = backtracking.run('testcases/test6.txt')
-    backtracking.final_solution(run_time, solution)
+    solution = Backtracking().run(grid)
+    print('\n'.join(', '.join(row) for row in solution) if solution else 'No solution found.')
 
     print('\nBrute Force:')
-    run_time, solution = brute_force.run('testcases/test6.txt')
-    brute_force.print_solution(run_time, solution)
-
+    solution = BruteForce().run(grid)
+    print('\n'.join(', '.join(row) for row in solution) if solution else 'No solution found.')
@@ -0,0 +1,135 @@
+import threading
+import time
+
+#-----------------Budget.py-----------------
+"""
+This module lets a caller bound how long a solver may run.
+How this module works:
+1. A Budget holds an optional wall-clock limit (seconds), a conflict limit (CDCL solvers), a node limit
+   (Backtracking nodes, BruteForce candidates) and an optional CancelToken.
+2. budget.start() fixes the deadline; solvers then call budget.check(conflicts=..., nodes=...) in their hot loops,
+   which raises BudgetExceeded as soon as one limit is hit or the token is cancelled.
+3. A solver that runs out of budget does not hang nor report UNSAT: its `status` becomes STATUS_UNKNOWN.
+4. A CancelToken may be shared by many solves (threads, worker pools, services); cancel() stops all of them.
+   Solvers that cannot poll (the PySAT backend) register a callback with on_cancel() instead.
+"""
+
+STATUS_SAT = 'sat'
+STATUS_UNSAT = 'unsat'
+STATUS_UNKNOWN = 'unknown'
+
+
+class BudgetExceeded(Exception):
+    """raised inside a solver when its budget is exhausted"""
+
+
+class CancelToken:
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self) -> None:
+        """ask every solve using this token to stop"""
+        with self._lock:
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def on_cancel(self, callback) -> None:
+        """call `callback` on cancellation (right away if the token is already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class Budget:
+    def __init__(self, time_limit: float = None, max_conflicts: int = None, max_nodes: int = None,
+                 token: CancelToken = None) -> None:
+        """
+            - time_limit: wall-clock seconds from start(), None for no limit
+            - max_conflicts: maximum number of conflicts of a CDCL solver, None for no limit
+            - max_nodes: maximum number of search nodes / candidates, None for no limit
+            - token: CancelToken checked cooperatively, None for no external cancellation
+        """
+        self.time_limit = time_limit
+        self.max_conflicts = max_conflicts
+        self.max_nodes = max_nodes
+        self.token = token
+        self.deadline = None
+        self.reason = None  # why the budget was exceeded: 'time', 'conflicts', 'nodes' or 'cancelled'
+
+    @property
+    def unlimited(self) -> bool:
+        return self.time_limit is None and self.max_conflicts is None and self.max_nodes is None and self.token is None
+
+    def start(self) -> 'Budget':
+        """fix the deadline, called by the solver when it starts"""
+        self.reason = None
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        return self
+
+    def remaining_time(self) -> float | None:
+        """seconds left before the deadline, None without time limit"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def remainder(self) -> 'Budget':
+        """
+            budget of a follow-up solve (a fallback, the next band, ...): the time left before the deadline of this one,
+            the same limits and token. The follow-up solver calls start() on it without extending the deadline.
+        """
+        return Budget(time_limit=self.remaining_time(), max_conflicts=self.max_conflicts, max_nodes=self.max_nodes,
+                      token=self.token)
+
+    def exceeded(self, conflicts: int = 0, nodes: int = 0) -> bool:
+        if self.max_conflicts is not None and conflicts > self.max_conflicts:
+            self.reason = 'conflicts'
+        elif self.max_nodes is not None and nodes > self.max_nodes:
+            self.reason = 'nodes'
+        elif self.token is not None and self.token.cancelled():
+            self.reason = 'cancelled'
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.reason = 'time'
+        else:
+            return False
+        return True
+
+    def check(self, conflicts: int = 0, nodes: int = 0) -> None:
+        """raise BudgetExceeded if a limit is reached"""
+        if self.exceeded(conflicts, nodes):
+            raise BudgetExceeded(self.reason)
+
+
+class _Unlimited(Budget):
+    """budget used by default: never exceeded"""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def start(self) -> 'Budget':
+        return self
+
+    def remainder(self) -> 'Budget':
+        return self
+
+    def exceeded(self, conflicts: int = 0, nodes: int = 0) -> bool:
+        return False
+
+    def check(self, conflicts: int = 0, nodes: int = 0) -> None:
+        pass
+
+
+UNLIMITED = _Unlimited()
@@ -0,0 +1,98 @@
+import time
+
+#-----------------Instrumentation.py-----------------
+"""
+This module collects phase timings and solver counters of a solve.
+How this module works:
+1. A SolveStats object is passed to GemHunter (and from there to the solvers).
+2. stats.phase(name) is a context manager that times a phase (parse, gen_clauses, construct, solve, decode);
+   the time of a phase entered several times is accumulated.
+3. stats.count(name, value) adds to a counter (decisions, propagations, conflicts, learnt_clauses, nodes, ...).
+   Solvers keep their counters in plain ints inside their loops and report them once at the end.
+4. Callbacks given to SolveStats are called as callback(kind, name, value) with kind 'phase' or 'counter'
+   every time something is recorded, so a caller can watch a solve while it runs.
+5. NULL_STATS is the default everywhere: its methods do nothing, so an uninstrumented solve pays nearly nothing.
+"""
+
+class _Phase:
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name: str) -> None:
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class SolveStats:
+    enabled = True
+
+    def __init__(self, callbacks: list = None) -> None:
+        self.timings = {}   # phase name -> seconds
+        self.counters = {}  # counter name -> int
+        self.callbacks = list(callbacks or [])
+
+    def phase(self, name: str):
+        """time the body of a `with` block as phase `name`"""
+        return _Phase(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        """add `seconds` to the timing of phase `name`"""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for callback in self.callbacks:
+            callback('phase', name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """add `value` to counter `name`"""
+        self.counters[name] = self.counters.get(name, 0) + value
+        for callback in self.callbacks:
+            callback('counter', name, value)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.counters.clear()
+
+    def report(self) -> str:
+        """human readable summary, one line per phase/counter"""
+        lines = [f'{name}: {seconds:.6f} s' for name, seconds in self.timings.items()]
+        lines += [f'{name}: {value}' for name, value in self.counters.items()]
+        return '\n'.join(lines)
+
+
+class _NullStats(SolveStats):
+    """stats sink used when instrumentation is disabled"""
+    enabled = False
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def phase(self, name: str):
+        return _NULL_PHASE
+
+    def record(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+
+NULL_STATS = _NullStats()
@@ -0,0 +1,207 @@
+import random
+from Instrumentation import NULL_STATS
+from Budget import UNLIMITED, BudgetExceeded, STATUS_SAT, STATUS_UNSAT, STATUS_UNKNOWN
+
+#-----------------LocalSearch.py-----------------
+"""
+Stochastic local search (probSAT / WalkSAT) for satisfiable formulas.
+Production boards are generated from a hidden solution, so they are always satisfiable: local search finds a model
+much faster than a complete search, but it can never prove that there is none.
+How this class works:
+1. Clauses are flattened into plain lists: `clause_vars[c]` holds the variables of clause c, `occ_true[lit]` the clauses containing lit.
+2. For the current assignment we keep, incrementally on every flip:
+    - num_true[c]: number of true literals of clause c,
+    - critical[c]: XOR of the variables of the true literals of c (so it is THE true variable when num_true[c] == 1),
+    - break_count[v]: clauses that become false if v is flipped (v is their only true literal),
+    - make_count[v]: false clauses that become true if v is flipped,
+    - the list of false clauses, with the position of every false clause in it (O(1) add/remove).
+3. Each step picks a random false clause and flips one of its variables:
+    - 'probsat': variable v with probability proportional to (1 + break_count[v]) ** -cb,
+    - 'walksat': a variable with break_count 0 if any; else with probability `noise` a random one,
+      otherwise the one with the smallest break_count (largest make_count on ties).
+4. After `max_flips` flips without a model the search restarts from a new random assignment, up to `max_tries` times.
+   Then `status` is STATUS_UNKNOWN (local search is incomplete) and the caller may hand the formula to a complete solver.
+"""
+
+class LocalSearchSolver:
+    ALGORITHMS = ('probsat', 'walksat')
+
+    def __init__(
+        self,
+        clauses: list,
+        algorithm: str = 'probsat',
+        noise: float = 0.5,
+        cb: float = 2.3,
+        max_flips: int = 100000,
+        max_tries: int = 10,
+        true_probability: float = 0.5,
+        seed: int = None
+    ) -> None:
+        """
+            - clauses: list of clauses, e.g. [[-1,2,3], [-1,3,-5], [-5]]
+            - algorithm: 'probsat' or 'walksat'
+            - noise: WalkSAT probability of a random walk step
+            - cb: probSAT break exponent (higher = greedier)
+            - max_flips: flips per try before a restart
+            - max_tries: number of tries (restarts + 1)
+            - true_probability: probability of a variable to start True (boards have far more gems than traps)
+            - seed: seed of the random generator
+        """
+        if algorithm not in LocalSearchSolver.ALGORITHMS:
+            raise ValueError(f'unknown algorithm {algorithm!r}, expected one of {LocalSearchSolver.ALGORITHMS}')
+        self.algorithm = algorithm
+        self.noise = noise
+        self.cb = cb
+        self.max_flips = max_flips
+        self.max_tries = max_tries
+        self.true_probability = true_probability
+        self.rng = random.Random(seed)
+        self.status = None
+        self.flips = 0
+        self.tries = 0
+
+        self.has_empty_clause = False
+        self.clause_lits = []    # literals of every clause (no duplicates, no tautologies)
+        for clause in clauses:
+            lits = list(dict.fromkeys(clause))
+            if not lits:
+                self.has_empty_clause = True
+            elif not any(-lit in lits for lit in lits):
+                self.clause_lits.append(lits)
+        self.variables = sorted({abs(lit) for lits in self.clause_lits for lit in lits})
+        n_vars = self.variables[-1] if self.variables else 0
+        self.clause_vars = [[abs(lit) for lit in lits] for lits in self.clause_lits]
+        # occ_true[v] (resp. occ_false[v]): clauses made true by v = True (resp. v = False)
+        self.occ_true = [[] for _ in range(n_vars + 1)]
+        self.occ_false = [[] for _ in range(n_vars + 1)]
+        for c, lits in enumerate(self.clause_lits):
+            for lit in lits:
+                (self.occ_true if lit > 0 else self.occ_false)[abs(lit)].append(c)
+        # probSAT weight of each break count, break counts are bounded by the number of occurrences
+        max_break = max((len(occ) for occ in self.occ_true + self.occ_false), default=0)
+        self.weights = [(1.0 + b) ** -cb for b in range(max_break + 1)]
+
+    def __restart(self) -> None:
+        """new random assignment and recompute every counter from scratch"""
+        n_vars = len(self.occ_true) - 1
+        self.value = [False] + [self.rng.random() < self.true_probability for _ in range(n_vars)]
+        n_clauses = len(self.clause_lits)
+        self.num_true = [0] * n_clauses
+        self.critical = [0] * n_clauses
+        self.break_count = [0] * (n_vars + 1)
+        self.make_count = [0] * (n_vars + 1)
+        self.unsat = []
+        self.unsat_pos = [-1] * n_clauses
+        value = self.value
+        for c, lits in enumerate(self.clause_lits):
+            count = 0
+            critical = 0
+            for lit in lits:
+                if value[abs(lit)] == (lit > 0):
+                    count += 1
+                    critical ^= abs(lit)
+            self.num_true[c] = count
+            self.critical[c] = critical
+            if count == 0:
+                self.unsat_pos[c] = len(self.unsat)
+                self.unsat.append(c)
+                for v in self.clause_vars[c]:
+                    self.make_count[v] += 1
+            elif count == 1:
+                self.break_count[critical] += 1
+
+    def __flip(self, v: int) -> None:
+        num_true, critical = self.num_true, self.critical
+        break_count, make_count = self.break_count, self.make_count
+        unsat, unsat_pos = self.unsat, self.unsat_pos
+        self.value[v] = not self.value[v]
+        if self.value[v]:
+            made_true, made_false = self.occ_true[v], self.occ_false[v]
+        else:
+            made_true, made_false = self.occ_false[v], self.occ_true[v]
+        for c in made_true:
+            count = num_true[c]
+            if count == 0:
+                # the clause becomes satisfied, v is its only true literal
+                last = unsat.pop()
+                if last != c:
+                    unsat[unsat_pos[c]] = last
+                    unsat_pos[last] = unsat_pos[c]
+                unsat_pos[c] = -1
+                for u in self.clause_vars[c]:
+                    make_count[u] -= 1
+                break_count[v] += 1
+            elif count == 1:
+                break_count[critical[c]] -= 1
+            num_true[c] = count + 1
+            critical[c] ^= v
+        for c in made_false:
+            count = num_true[c] - 1
+            num_true[c] = count
+            critical[c] ^= v
+            if count == 0:
+                unsat_pos[c] = len(unsat)
+                unsat.append(c)
+                for u in self.clause_vars[c]:
+                    make_count[u] += 1
+                break_count[v] -= 1
+            elif count == 1:
+                break_count[critical[c]] += 1
+
+    def __pick(self, c: int) -> int:
+        """variable of false clause `c` to flip"""
+        variables = self.clause_vars[c]
+        break_count = self.break_count
+        if self.algorithm == 'probsat':
+            weights = self.weights
+            total = 0.0
+            for v in variables:
+                total += weights[break_count[v]]
+            threshold = self.rng.random() * total
+            for v in variables:
+                threshold -= weights[break_count[v]]
+                if threshold <= 0:
+                    return v
+            return variables[-1]
+        best = min(variables, key=lambda v: (break_count[v], -self.make_count[v]))
+        if break_count[best] == 0 or self.rng.random() >= self.noise:
+            return best
+        return self.rng.choice(variables)
+
+    def solve(self, stats=NULL_STATS, budget=UNLIMITED):
+        """
+            run the local search
+            input: `stats` receives the flips and tries counters, `budget` limits time (and flips, as nodes)
+            returns list of resulted values (e.g., [1,-2,-3,5,9,-7]); or None (then `status` tells why)
+        """
+        self.flips = self.tries = 0
+        budget.start()
+        try:
+            model = self.__search(budget)
+        except BudgetExceeded:
+            model = None
+        stats.count('flips', self.flips)
+        stats.count('tries', self.tries)
+        if self.has_empty_clause:
+            self.status = STATUS_UNSAT
+            return None
+        self.status = STATUS_UNKNOWN if model is None else STATUS_SAT
+        return model
+
+    def __search(self, budget) -> list | None:
+        if self.has_empty_clause:
+            return None
+        rng = self.rng
+        for _ in range(self.max_tries):
+            self.tries += 1
+            self.__restart()
+            for _ in range(self.max_flips):
+                if not self.unsat:
+                    return [v if self.value[v] else -v for v in self.variables]
+                self.flips += 1
+                if self.flips & 1023 == 0:
+                    budget.check(nodes=self.flips)
+                self.__flip(self.__pick(self.unsat[rng.randrange(len(self.unsat))]))
+            if not self.unsat:
+                return [v if self.value[v] else -v for v in self.variables]
+        return None
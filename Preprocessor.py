@@ -0,0 +1,277 @@
+import time
+from Budget import STATUS_UNSAT
+
+#-----------------Preprocessor.py-----------------
+"""
+This class simplifies a CNF formula between the encoding (BoardCNF) and the solver (PySAT, cdcl).
+How this class works:
+1. Clauses are stored as sets of literals with occurrence lists (literal -> indices of the live clauses containing it).
+2. run() applies, in order:
+    - unit propagation: satisfied clauses are removed and false literals are dropped,
+    - pure literal elimination,
+    - subsumption (C subset of D removes D) and self-subsumption (C = A + l, D contains A + -l: -l is removed from D),
+    - bounded variable elimination: a variable is replaced by all the non-tautological resolvents of its clauses
+      when there are no more resolvents than original clauses,
+    - failed literal probing: if propagating l leads to a conflict, -l is a unit.
+3. run() returns the reduced clauses. If a conflict is found the formula is unsatisfiable: status is STATUS_UNSAT and [[]] is returned,
+   so that every solver reports UNSAT by itself.
+4. extend_model() turns a model of the reduced formula into a model of the original one: fixed variables get their value,
+   then the eliminated variables (pure literals included) are set in reverse order of elimination so that their saved clauses are satisfied.
+5. report() tells how much the formula shrank and how long it took.
+"""
+
+class _Unsat(Exception):
+    """the formula was proved unsatisfiable"""
+
+
+class Preprocessor:
+    def __init__(
+        self,
+        clauses: list,
+        eliminate: bool = True,
+        probe: bool = True,
+        occurrence_limit: int = 16,
+        probe_limit: int = 5000
+    ) -> None:
+        """
+            - clauses: list of clauses, e.g. [[-1,2,3], [-1,3,-5], [-5]]
+            - eliminate / probe: enable bounded variable elimination / failed literal probing
+            - occurrence_limit: a variable occurring in more clauses is not eliminated
+            - probe_limit: maximum number of probed variables
+        """
+        self.original = clauses
+        self.variables = sorted({abs(lit) for clause in clauses for lit in clause})
+        self.eliminate = eliminate
+        self.probe = probe
+        self.occurrence_limit = occurrence_limit
+        self.probe_limit = probe_limit
+        self.status = None
+        self.clauses = []       # set of literals, or None once removed
+        self.occ = {}           # literal -> set of indices of live clauses
+        self.keys = {}          # frozenset of literals -> index, to drop duplicates
+        self.fixed = {}         # variable -> value, for units implied by the formula
+        self.stack = []         # (variable, saved clauses) for every eliminated variable, in order
+        self.queue = []         # units waiting for propagation
+        self.counters = {'subsumed': 0, 'strengthened': 0, 'pure_literals': 0, 'eliminated_vars': 0, 'failed_literals': 0}
+        self.seconds = 0.0
+
+    # ---------- clause database ----------
+    def _add(self, literals) -> None:
+        clause = set()
+        for lit in literals:
+            value = self.fixed.get(abs(lit))
+            if value is None:
+                clause.add(lit)
+            elif value == (lit > 0):
+                return  # satisfied
+        if any(-lit in clause for lit in clause):
+            return  # tautology
+        if not clause:
+            raise _Unsat()
+        if len(clause) == 1:
+            self.queue.append(next(iter(clause)))
+            return
+        key = frozenset(clause)
+        if key in self.keys:
+            return
+        idx = len(self.clauses)
+        self.clauses.append(clause)
+        self.keys[key] = idx
+        for lit in clause:
+            self.occ.setdefault(lit, set()).add(idx)
+
+    def _remove(self, idx: int) -> None:
+        clause = self.clauses[idx]
+        self.clauses[idx] = None
+        del self.keys[frozenset(clause)]
+        for lit in clause:
+            self.occ[lit].discard(idx)
+
+    def _strengthen(self, idx: int, lit: int) -> None:
+        """remove `lit` from clause `idx`"""
+        clause = self.clauses[idx]
+        self._remove(idx)
+        self._add(clause - {lit})
+
+    def _occurrences(self, lit: int) -> set:
+        return self.occ.get(lit, set())
+
+    def live_clauses(self) -> list:
+        return [sorted(clause) for clause in self.clauses if clause is not None]
+
+    # ---------- simplifications ----------
+    def _propagate(self) -> None:
+        while self.queue:
+            lit = self.queue.pop()
+            var, value = abs(lit), lit > 0
+            if var in self.fixed:
+                if self.fixed[var] != value:
+                    raise _Unsat()
+                continue
+            self.fixed[var] = value
+            for idx in list(self._occurrences(lit)):
+                self._remove(idx)
+            for idx in list(self._occurrences(-lit)):
+                self._strengthen(idx, -lit)
+
+    def _eliminate_var(self, var: int, resolvents: list) -> None:
+        """replace every clause of `var` by `resolvents`, saving them for extend_model()"""
+        indices = list(self._occurrences(var)) + list(self._occurrences(-var))
+        self.stack.append((var, [sorted(self.clauses[idx]) for idx in indices]))
+        for idx in indices:
+            self._remove(idx)
+        for resolvent in resolvents:
+            self._add(resolvent)
+        self._propagate()
+
+    def _pure_literals(self) -> None:
+        changed = True
+        while changed:
+            changed = False
+            for var in self.variables:
+                if var in self.fixed:
+                    continue
+                pos, neg = self._occurrences(var), self._occurrences(-var)
+                if bool(pos) != bool(neg):
+                    self._eliminate_var(var, [])
+                    self.counters['pure_literals'] += 1
+                    changed = True
+
+    def _subsume(self) -> None:
+        order = sorted((idx for idx, clause in enumerate(self.clauses) if clause is not None),
+                       key=lambda idx: len(self.clauses[idx]))
+        for idx in order:
+            clause = self.clauses[idx]
+            if clause is None:
+                continue
+            # subsumption: every clause containing `clause` is redundant
+            lit = min(clause, key=lambda lit: len(self._occurrences(lit)))
+            for other in list(self._occurrences(lit)):
+                if other != idx and clause <= self.clauses[other]:
+                    self._remove(other)
+                    self.counters['subsumed'] += 1
+            # self-subsumption: resolving on lit strengthens the other clause
+            for lit in list(clause):
+                for other in list(self._occurrences(-lit)):
+                    other_clause = self.clauses[other]
+                    if len(other_clause) >= len(clause) and all(x in other_clause for x in clause if x != lit):
+                        self._strengthen(other, -lit)
+                        self.counters['strengthened'] += 1
+                if self.clauses[idx] is not clause:
+                    break   # `clause` itself was strengthened or removed
+            self._propagate()
+
+    def _bounded_elimination(self) -> None:
+        candidates = sorted(
+            (var for var in self.variables if var not in self.fixed),
+            key=lambda var: len(self._occurrences(var)) * len(self._occurrences(-var))
+        )
+        for var in candidates:
+            pos, neg = self._occurrences(var), self._occurrences(-var)
+            if var in self.fixed or not pos or not neg or len(pos) + len(neg) > self.occurrence_limit:
+                continue
+            resolvents = []
+            for p in pos:
+                for n in neg:
+                    resolvent = (self.clauses[p] - {var}) | (self.clauses[n] - {-var})
+                    if not any(-lit in resolvent for lit in resolvent):
+                        resolvents.append(resolvent)
+                if len(resolvents) > len(pos) + len(neg):
+                    break
+            if len(resolvents) <= len(pos) + len(neg):
+                self._eliminate_var(var, resolvents)
+                self.counters['eliminated_vars'] += 1
+
+    def _failed(self, lit: int) -> bool:
+        """propagate `lit` on the current clauses, without changing them; True if this leads to a conflict"""
+        true = {lit}
+        queue = [lit]
+        while queue:
+            t = queue.pop()
+            for idx in self._occurrences(-t):
+                clause = self.clauses[idx]
+                if any(x in true for x in clause):
+                    continue
+                unassigned = [x for x in clause if -x not in true]
+                if not unassigned:
+                    return True
+                if len(unassigned) == 1:
+                    true.add(unassigned[0])
+                    queue.append(unassigned[0])
+        return False
+
+    def _probe(self) -> None:
+        probed = 0
+        for var in self.variables:
+            if probed >= self.probe_limit:
+                break
+            if var in self.fixed or not self._occurrences(var) or not self._occurrences(-var):
+                continue
+            probed += 1
+            for lit in (var, -var):
+                if self._failed(lit):
+                    self.queue.append(-lit)
+                    self.counters['failed_literals'] += 1
+                    self._propagate()
+                    break
+
+    # ---------- public interface ----------
+    def run(self) -> list:
+        """
+            simplify the formula
+            returns the reduced list of clauses ([[]] if the formula is unsatisfiable)
+        """
+        start = time.perf_counter()
+        try:
+            for clause in self.original:
+                self._add(clause)
+            self._propagate()
+            self._pure_literals()
+            self._subsume()
+            if self.eliminate:
+                self._bounded_elimination()
+            if self.probe:
+                self._probe()
+                self._subsume()
+            self._pure_literals()
+            reduced = self.live_clauses()
+        except _Unsat:
+            self.status = STATUS_UNSAT
+            reduced = [[]]
+        self.seconds = time.perf_counter() - start
+        self.reduced = reduced
+        return reduced
+
+    def extend_model(self, model: list) -> list:
+        """
+            extend a model of the reduced formula (list of literals) to all the variables of the original formula
+            returns a sorted list of literals (e.g., [1,-2,-3,5,9,-7])
+        """
+        values = {abs(lit): lit > 0 for lit in model}
+        values.update(self.fixed)
+
+        def satisfied(lit):
+            return values.get(abs(lit), False) == (lit > 0)
+
+        for var, saved in reversed(self.stack):
+            values[var] = False
+            for clause in saved:
+                if var in clause and not any(satisfied(lit) for lit in clause if lit != var):
+                    values[var] = True
+                    break
+        return [var if values.get(var, False) else -var for var in self.variables]
+
+    def report(self) -> dict:
+        """size of the formula before/after preprocessing, what was done and how long it took"""
+        reduced = getattr(self, 'reduced', self.original)
+        return {
+            'original_clauses': len(self.original),
+            'clauses': len(reduced),
+            'original_vars': len(self.variables),
+            'vars': len({abs(lit) for clause in reduced for lit in clause}),
+            'original_literals': sum(len(clause) for clause in self.original),
+            'literals': sum(len(clause) for clause in reduced),
+            'fixed_vars': len(self.fixed),
+            **self.counters,
+            'seconds': self.seconds,
+        }
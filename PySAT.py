@@ -1,5 +1,8 @@
 from pysat.solvers import Solver
 from pysat.formula import CNF
+import threading
+from Instrumentation import NULL_STATS
+from Budget import UNLIMITED, STATUS_SAT, STATUS_UNSAT, STATUS_UNKNOWN
 
 # -------------Documentation-----------------
 """
@@ -60,9 +63,46 @@ class PySatSolver:
     def __init__(self, clauses: list, solver: str):
         cnf = CNF(from_clauses=clauses)
         self.solver = Solver(name=solver, bootstrap_with=cnf) # Initialize the solver with the CNF formula
+        self.status = None  # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN (budget exceeded) after solve()
 
-    def solve(self) -> list | None:
-        result = self.solver.solve()  # Solve the CNF formula
+    def __solve_limited(self, budget) -> bool | None:
+        """
+            solve within `budget`: conflicts are limited with conf_budget, the deadline and the cancel token
+            interrupt the solver from another thread. Returns None if the solver was stopped.
+        """
+        budget.start()
+        if budget.exceeded():
+            return None
+        if budget.max_conflicts is not None:
+            self.solver.conf_budget(budget.max_conflicts)
+        timer = None
+        if budget.deadline is not None:
+            timer = threading.Timer(budget.remaining_time(), self.solver.interrupt)
+            timer.daemon = True
+            timer.start()
+        if budget.token is not None:
+            budget.token.on_cancel(self.solver.interrupt)
+        try:
+            return self.solver.solve_limited(expect_interrupt=True)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if budget.token is not None:
+                budget.token.remove_callback(self.solver.interrupt)
+            self.solver.clear_interrupt()
+
+    def solve(self, stats=NULL_STATS, budget=UNLIMITED) -> list | None:
+        if budget.unlimited:
+            result = self.solver.solve()  # Solve the CNF formula
+        else:
+            result = self.__solve_limited(budget)
+        if stats.enabled:
+            for name, value in self.solver.accum_stats().items(): # conflicts, decisions, propagations, restarts
+                stats.count(name, value)
+        if result is None:
+            self.status = STATUS_UNKNOWN
+            return None
+        self.status = STATUS_SAT if result else STATUS_UNSAT
         if result:
             return self.solver.get_model() # Return the satisfying assignment if a solution is found
         return None
@@ -0,0 +1,174 @@
+import numpy as np
+import PySAT
+from BoardCNF import BoardCNF
+from BoardParser import iter_rows, validate_row, format_board, GEM
+from BoardBinary import apply_solution
+from Verifier import check_solution
+from Instrumentation import NULL_STATS
+from Budget import UNLIMITED, STATUS_UNSAT, STATUS_UNKNOWN
+
+#-----------------TiledSolver.py-----------------
+"""
+Out-of-core solving of boards too large to hold in memory: the board is streamed in horizontal bands of rows.
+How this class works:
+1. Rows are read one at a time with BoardParser.iter_rows (text boards only), checked with BoardParser.validate_row,
+   and kept in three small buffers:
+    - ahead: rows read but not solved yet (at most band + halo rows, at least one row past the band until the end),
+    - pending: rows solved but not written yet (`reopen` rows, more after conflicts), they can still be solved again,
+    - tail: the last 2 rows written, the only written rows a later number can still see.
+2. Each step solves a window made of 2 solved rows (the context), the next `band` rows and `halo` rows after them
+   (at least 1: the numbers of the last committed row must see their lower neighbours).
+   The context rows keep their solution as revealed T/G cells, so the boundary of the previous band is fixed
+   in the formula itself and its cells get no variable at all (BoardCNF, 'dense' encoding).
+3. Only the numbers whose whole neighbourhood lies in the window are encoded (the others are masked as gems):
+   a number of the last halo row is encoded again by the next window, once its lower neighbours are read.
+4. If the window is satisfiable, its first `band` rows are committed to pending, and the pending rows older
+   than `reopen` rows are written to the output. The halo rows are solved again by the next window.
+5. If the window is unsatisfiable, the fixed context is to blame: the last pending rows are reopened (put back
+   in front of ahead) and the band is widened to cover them. Every conflict in a row reopens twice as many rows
+   as the previous one, until a window is solved. After a conflict the halo is doubled (up to `band` rows) and
+   the pending buffer grows to twice the window, so that later conflicts have more rows to reopen.
+   With nothing left to reopen, the board is unsatisfiable if nothing was written yet; otherwise the written rows
+   cannot be extended: the status is STATUS_UNKNOWN and `reason` is 'conflict' (a wider band or halo may help).
+6. Every window model is checked with Verifier.check_solution before its rows are committed.
+Peak memory depends on the band, halo and reopen rows (times the row width), not on the number of rows of the board;
+only conflicts make the windows and the pending buffer grow.
+"""
+
+class TiledSolver:
+    def __init__(self, band: int = 64, halo: int = 4, reopen: int = None, solver: str = 'g4'):
+        """
+            - band: rows committed per window
+            - halo: extra rows solved after the band so that the committed rows can be extended
+            - reopen: solved rows kept unwritten, reopened when a window is unsatisfiable (default: 2 * (band + halo))
+            - solver: name of the PySAT solver used on every window
+        """
+        if band < 1 or halo < 0:
+            raise ValueError('band must be positive and halo non-negative')
+        self.band = band
+        self.halo = halo
+        self.reopen = 2 * (band + max(halo, 1)) if reopen is None else reopen
+        self.solver = solver
+        self.status = None  # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN after solve()
+        self.reason = None  # with STATUS_UNKNOWN: 'conflict' or the reason of the budget ('time', 'cancelled', ...)
+        self.bands = 0  # windows solved by the last solve
+        self.widenings = 0  # windows widened after a conflict
+        self.rows_written = 0
+        self.max_window_rows = 0  # largest window of the last solve, this is what bounds the memory
+
+    def __solve_window(self, window: np.ndarray, first: int, last: int, stats, budget):
+        """
+            solve the numbers of rows first..last-1 of `window`
+            returns the solved window, or None (then self.status tells why)
+        """
+        masked = window.copy()
+        outside = np.ones(len(window), dtype=bool)
+        outside[first:last] = False
+        masked[outside] = np.where(masked[outside] >= 0, GEM, masked[outside])
+        with stats.phase('gen_clauses'):
+            board_cnf = BoardCNF(masked, *masked.shape, 'dense')
+            clauses = board_cnf.gen_clauses()
+        stats.count('clauses', len(clauses))
+        with stats.phase('solve'):
+            solver = PySAT.PySatSolver(clauses, self.solver)
+            model = solver.solve(stats, budget.remainder())   # what is left of the whole solve
+        self.status = solver.status
+        if model is None:
+            return None
+        with stats.phase('verify'):
+            check_solution(masked, apply_solution(masked, board_cnf.trap_mask(model)))
+        return apply_solution(window, board_cnf.trap_mask(model))
+
+    def solve(self, rows, output, stats=NULL_STATS, budget=UNLIMITED) -> str:
+        """
+            input: `rows` iterable of int8 rows of cell codes (e.g. BoardParser.iter_rows), `output` binary file
+            the solved rows are written to `output` as soon as they cannot change any more
+            returns the status (STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN)
+        """
+        self.bands = self.widenings = self.rows_written = self.max_window_rows = 0
+        self.status = self.reason = None
+        budget.start()
+        rows = iter(rows)
+        ahead, pending, tail = [], [], []
+        width = self.band
+        halo = self.halo
+        keep = self.reopen   # pending rows kept unwritten
+        step = self.band    # pending rows reopened by the next conflict
+        exhausted = False
+        rows_read = 0
+
+        def write(solved):
+            nonlocal tail
+            if solved:
+                with stats.phase('write'):
+                    output.write(format_board(np.vstack(solved)))
+                self.rows_written += len(solved)
+                tail = (tail + solved)[-2:]
+
+        while True:
+            while not exhausted and len(ahead) < width + max(halo, 1):
+                row = next(rows, None)
+                if row is None:
+                    exhausted = True
+                    if rows_read > 0:   # the last row read is still in ahead, now known to be the last of the board
+                        validate_row(ahead[-1], rows_read - 1, rows_read == 1, True)
+                else:
+                    validate_row(row, rows_read, rows_read == 0, False)
+                    ahead.append(row)
+                    rows_read += 1
+            if not ahead:
+                # every row is written, self.status is the one of the last window: STATUS_SAT
+                if pending or self.rows_written != rows_read:
+                    raise RuntimeError(f'{self.rows_written} rows written out of {rows_read}')
+                break
+            if budget.exceeded():
+                self.status = STATUS_UNKNOWN
+                self.reason = budget.reason
+                break
+            context = (tail + [row for _, row in pending])[-2:]
+            window = np.vstack(context + ahead)
+            self.max_window_rows = max(self.max_window_rows, len(window))
+            # numbers of the first context row see a row that is not in the window, and so do the numbers of the last
+            # row unless it is the last row of the board
+            first = max(len(context) - 1, 0)
+            last = len(window) if exhausted else len(window) - 1
+            self.bands += 1
+            solved = self.__solve_window(window, first, last, stats, budget)
+            if solved is not None:
+                committed = len(ahead) if exhausted else min(width, len(ahead))
+                pending += zip(ahead[:committed], solved[len(context):len(context) + committed])
+                ahead = ahead[committed:]
+                unwritten = 0 if exhausted and not ahead else keep
+                write([row for _, row in pending[:max(len(pending) - unwritten, 0)]])
+                pending = pending[max(len(pending) - unwritten, 0):]
+                width = self.band
+                step = self.band
+            elif self.status == STATUS_UNSAT and pending:
+                # the fixed context cannot be extended: solve the last pending rows again in a wider band,
+                # reopen more rows if this conflicts again, and look further ahead and keep more rows from now on
+                count = min(step, len(pending))
+                ahead = [original for original, _ in pending[-count:]] + ahead
+                pending = pending[:-count]
+                width += count
+                step *= 2
+                halo = min(max(2 * halo, 1), max(self.band, self.halo))
+                keep = max(keep, 2 * (width + halo))
+                self.widenings += 1
+            else:
+                if self.status == STATUS_UNSAT and self.rows_written > 0:
+                    self.status = STATUS_UNKNOWN    # only the rows already written are proved wrong
+                    self.reason = 'conflict'
+                elif self.status == STATUS_UNKNOWN:
+                    # the window had budget.remainder(): its deadline and token are the ones of `budget`,
+                    # otherwise PySAT ran out of conflicts
+                    self.reason = budget.reason if budget.exceeded() else 'conflicts'
+                break
+        if self.bands == 0 and self.status != STATUS_UNKNOWN:
+            raise ValueError('the board is empty')
+        stats.count('bands', self.bands)
+        stats.count('widenings', self.widenings)
+        return self.status
+
+    def solve_file(self, filepath: str, output, stats=NULL_STATS, budget=UNLIMITED) -> str:
+        """stream the text board `filepath` (raises ValueError on an invalid row) and write its solution to `output`"""
+        return self.solve(iter_rows(filepath), output, stats, budget)
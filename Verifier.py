@@ -0,0 +1,77 @@
+import numpy as np
+from BoardParser import UNKNOWN, TRAP, GEM
+
+#-----------------Verifier.py-----------------
+"""
+Vectorized check of solutions, shared by every backend.
+How this module works:
+1. neighbour_traps() counts the traps around every cell with 8 shifted views of a zero-padded trap mask
+   (the same as a 3x3 convolution with a hole in the middle). Leading axes are batch axes, so a whole stack
+   of candidate boards is counted in one call.
+2. verify() checks a solved board against its input board in one pass: revealed cells are unchanged,
+   every unknown cell became a trap or a gem, and every number equals its count of neighbouring traps.
+3. verify_batch() checks many candidate trap masks at once and returns one boolean per candidate.
+4. check_solution() raises InvalidSolution with the first wrong cell; GemHunter calls it after every solve.
+"""
+
+class InvalidSolution(RuntimeError):
+    """a solver returned a board that does not satisfy the puzzle"""
+
+
+def neighbour_traps(traps: np.ndarray) -> np.ndarray:
+    """
+        number of traps among the 8 neighbours of every cell
+        input: boolean array of shape (..., n, m), True where the cell is a trap
+        returns an int8 array of the same shape
+    """
+    n, m = traps.shape[-2:]
+    padding = [(0, 0)] * (traps.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(traps.astype(np.int8), padding)
+    counts = np.zeros(traps.shape, dtype=np.int8)
+    for di in range(3):
+        for dj in range(3):
+            if di != 1 or dj != 1:
+                counts += padded[..., di:di + n, dj:dj + m]
+    return counts
+
+
+def violations(board: np.ndarray, result: np.ndarray) -> np.ndarray:
+    """boolean n x m mask of the cells of `result` that are wrong for `board`"""
+    numbers = board >= 0
+    wrong = np.zeros(board.shape, dtype=bool)
+    wrong |= (board != UNKNOWN) & (result != board)                 # revealed cells must be kept
+    wrong |= (board == UNKNOWN) & (result != TRAP) & (result != GEM)    # unknown cells must be decided
+    wrong |= numbers & (neighbour_traps(result == TRAP) != board)      # numbers must match
+    return wrong
+
+
+def verify(board: np.ndarray, result: np.ndarray) -> bool:
+    """True if `result` is a valid solution of `board` (both are grids of cell codes)"""
+    return board.shape == result.shape and not violations(board, result).any()
+
+
+def verify_batch(board: np.ndarray, traps: np.ndarray) -> np.ndarray:
+    """
+        check a batch of candidate solutions of `board` at once
+        input: boolean array of shape (k, n, m), True where a candidate puts a trap
+        returns a boolean array of shape (k,): True for the candidates that solve the board
+        (traps only on unknown or revealed trap cells, every revealed trap kept, every number matched)
+    """
+    numbers = board >= 0
+    allowed = (board == UNKNOWN) | (board == TRAP)
+    counts = neighbour_traps(traps)
+    ok = (counts == board) | ~numbers
+    ok &= ~traps | allowed
+    ok &= traps | (board != TRAP)
+    return ok.reshape(len(traps), -1).all(axis=1)
+
+
+def check_solution(board: np.ndarray, result: np.ndarray) -> None:
+    """raise InvalidSolution if `result` does not solve `board`"""
+    if board.shape != result.shape:
+        raise InvalidSolution(f'solution has shape {result.shape}, the board has {board.shape}')
+    wrong = violations(board, result)
+    if wrong.any():
+        i, j = np.argwhere(wrong)[0]
+        raise InvalidSolution(f'line {i + 1}, column {j + 1}: the solution is wrong for this cell '
+                              f'({int(wrong.sum())} wrong cells)')
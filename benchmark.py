@@ -0,0 +1,270 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+# -------------Documentation-----------------
+"""
+Benchmarks of the solvers, one sub-command per experiment. Results are printed as one line per (input, method).
+    parallel: sequential cdcl.Solver vs cdcl.ParallelSolver (thread portfolio, shared learnt clauses)
+              vs the same portfolio run on a process pool (no sharing, first answer wins)
+    preprocess: size of the formula before/after the Preprocessor, and solve time of each backend
+                without preprocessing vs with it (preprocessing time included)
+    local-search: local search (probSAT, WalkSAT) vs PySAT, cdcl and Backtracking on large boards generated from a
+                  hidden solution (so always satisfiable); every solve is limited by --time-limit
+    tiled: peak memory (tracemalloc) and time of TiledSolver for several band widths vs loading and solving the whole board
+    startup: wall time of short-lived runs (import main, main.py --list-backends, one solve per backend) in fresh
+             interpreters, and which solver modules each of them imports
+Inputs are board files, or 'random:<vars>' for a random 3-SAT formula with 4.26 clauses per variable
+(near the satisfiability threshold, hard enough to produce conflicts).
+"""
+
+def load_clauses(source: str, seed: int = 0) -> list:
+    """clauses of a board file, or of a random 3-SAT formula for 'random:<vars>'"""
+    if source.startswith('random:'):
+        n = int(source.split(':')[1])
+        rng = random.Random(seed)
+        return [[v * rng.choice([1, -1]) for v in rng.sample(range(1, n + 1), 3)] for _ in range(int(n * 4.26))]
+    from BoardParser import parse_board
+    from BoardCNF import BoardCNF
+    grid = parse_board(source)
+    return BoardCNF(grid, *grid.shape).gen_clauses()
+
+
+def generate_board(n: int, m: int, density: float, reveal: float, seed: int = 0):
+    """
+        n x m board built from a hidden solution: each cell is a trap with probability `density`,
+        each gem is revealed (shows its number of neighbouring traps) with probability `reveal`, the rest is unknown
+    """
+    import numpy as np
+    from BoardParser import UNKNOWN
+    from Verifier import neighbour_traps
+    rng = np.random.default_rng(seed)
+    traps = rng.random((n, m)) < density
+    counts = neighbour_traps(traps)
+    revealed = ~traps & (rng.random((n, m)) < reveal)
+    return np.where(revealed, counts, UNKNOWN).astype(np.int8)
+
+
+def timed(fn, runs: int) -> tuple:
+    """returns (average seconds, last result) of `runs` calls to fn"""
+    total = 0.0
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        total += time.perf_counter() - start
+    return total / runs, result
+
+
+def _process_worker(args):
+    import cdcl
+    clauses, seed, heuristic = args
+    solver = cdcl.Solver(clauses, seed=seed, heuristic=heuristic)
+    solver.solve()
+    return solver.status
+
+
+def process_portfolio(clauses: list, workers: int, seed: int) -> str:
+    """same diversification as cdcl.ParallelSolver, one process per instance, the first answer wins"""
+    import cdcl
+    jobs = [(clauses, seed + k, cdcl.CDCL.HEURISTICS[k % len(cdcl.CDCL.HEURISTICS)]) for k in range(workers)]
+    with Pool(workers) as pool:
+        status = next(pool.imap_unordered(_process_worker, jobs))
+        pool.terminate()
+    return status
+
+
+def bench_parallel(args) -> None:
+    import cdcl
+    for source in args.inputs:
+        clauses = load_clauses(source, args.seed)
+        methods = {
+            'sequential': lambda: cdcl.Solver(clauses, seed=args.seed).solve(),
+            f'threads x{args.workers}': lambda: cdcl.ParallelSolver(clauses, workers=args.workers, seed=args.seed).solve(),
+            f'threads x{args.workers} (no sharing)':
+                lambda: cdcl.ParallelSolver(clauses, workers=args.workers, seed=args.seed, share_max_length=0).solve(),
+            f'processes x{args.workers}': lambda: process_portfolio(clauses, args.workers, args.seed),
+        }
+        for name, fn in methods.items():
+            seconds, _ = timed(fn, args.runs)
+            print(f'{source}\t{name}\t{seconds:.4f} s')
+
+
+def bench_preprocess(args) -> None:
+    import cdcl
+    import PySAT
+    from Preprocessor import Preprocessor
+    backends = {
+        'pysat': lambda clauses: PySAT.PySatSolver(clauses, args.pysat_solver).solve(),
+        'cdcl': lambda clauses: cdcl.Solver(clauses, seed=args.seed).solve(),
+    }
+    for source in args.inputs:
+        clauses = load_clauses(source, args.seed)
+        preprocessor = Preprocessor(clauses)
+        preprocessor.run()
+        report = preprocessor.report()
+        print(f"{source}\tclauses {report['original_clauses']} -> {report['clauses']}"
+              f"\tvars {report['original_vars']} -> {report['vars']}"
+              f"\tliterals {report['original_literals']} -> {report['literals']}"
+              f"\tpreprocess {report['seconds']:.4f} s")
+        for name, solve in backends.items():
+            raw, _ = timed(lambda: solve(clauses), args.runs)
+
+            def preprocess_and_solve():
+                pre = Preprocessor(clauses)
+                model = solve(pre.run())
+                return pre.extend_model(model) if model is not None else None
+
+            reduced, _ = timed(preprocess_and_solve, args.runs)
+            print(f'{source}\t{name}\traw {raw:.4f} s\tpreprocessed {reduced:.4f} s\tsaved {raw - reduced:+.4f} s')
+
+
+def bench_local_search(args) -> None:
+    import cdcl
+    import PySAT
+    import LocalSearch
+    import BruteForce_Backtrack
+    from BoardCNF import BoardCNF
+    from Budget import Budget
+    for size in args.sizes:
+        n, m = (int(x) for x in size.split('x'))
+        grid = generate_board(n, m, args.density, args.reveal, args.seed)
+        start = time.perf_counter()
+        clauses = BoardCNF(grid, n, m, 'dense').gen_clauses()
+        print(f'{size}\tencode (dense)\t{time.perf_counter() - start:.4f} s\t{len(clauses)} clauses')
+        methods = {
+            'probsat': lambda: LocalSearch.LocalSearchSolver(clauses, 'probsat', seed=args.seed),
+            'walksat': lambda: LocalSearch.LocalSearchSolver(clauses, 'walksat', seed=args.seed),
+            'pysat g4': lambda: PySAT.PySatSolver(clauses, 'g4'),
+            'cdcl': lambda: cdcl.Solver(clauses, seed=args.seed),
+        }
+        for name, make in methods.items():
+            budget = Budget(time_limit=args.time_limit)
+            start = time.perf_counter()
+            solver = make()
+            solver.solve(budget=budget)
+            print(f'{size}\t{name}\t{time.perf_counter() - start:.4f} s\t{solver.status}')
+        budget = Budget(time_limit=args.time_limit)
+        backtracking = BruteForce_Backtrack.Backtracking()
+        start = time.perf_counter()
+        backtracking.run(grid, budget=budget)
+        print(f'{size}\tbacktracking\t{time.perf_counter() - start:.4f} s\t{backtracking.status}')
+
+
+def bench_tiled(args) -> None:
+    import io
+    import tracemalloc
+    import PySAT
+    from BoardCNF import BoardCNF
+    from BoardParser import parse_board, write_board
+    from TiledSolver import TiledSolver
+    for size in args.sizes:
+        n, m = (int(x) for x in size.split('x'))
+        path = f'{args.directory}/tiled_{size}.txt'
+        write_board(path, generate_board(n, m, args.density, args.reveal, args.seed))
+        methods = {f'tiled band {band}': lambda band=band: TiledSolver(band, args.halo).solve_file(path, io.BytesIO())
+                   for band in args.bands}
+
+        def whole_board():
+            grid = parse_board(path)
+            solver = PySAT.PySatSolver(BoardCNF(grid, n, m, 'dense').gen_clauses(), 'g4')
+            solver.solve()
+            return solver.status
+
+        methods['whole board'] = whole_board
+        for name, fn in methods.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = fn()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{size}\t{name}\t{seconds:.4f} s\tpeak {peak / 2 ** 20:.1f} MiB\t{result}')
+
+
+_MODULES_PROBE = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    if sys.argv[0] == '-c':
+        exec(sys.argv[1], {'__name__': '__main__'})
+    else:
+        runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+print('\\n' + ' '.join(sys.modules), file=sys.stderr)
+"""
+
+
+def imported_modules(argv: list, directory: str) -> set:
+    """modules loaded by `python *argv` (python -X importtime misses the ones loaded with importlib)"""
+    stderr = subprocess.run([sys.executable, '-c', _MODULES_PROBE, *argv], cwd=directory, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    return set(stderr.rstrip('\n').rsplit('\n', 1)[-1].split())
+
+
+def bench_startup(args) -> None:
+    heavy = ('cdcl', 'PySAT', 'pysat', 'LocalSearch', 'BruteForce_Backtrack', 'Preprocessor', 'TiledSolver', 'matplotlib')
+    directory = os.path.dirname(os.path.abspath(__file__))
+    commands = {
+        'import main': ['-c', 'import main'],
+        'import main + every solver': ['-c', 'import main, cdcl, PySAT, LocalSearch, BruteForce_Backtrack, Preprocessor'],
+        'main.py --list-backends': ['main.py', '--list-backends'],
+    }
+    for backend in args.backends:
+        commands[f'main.py -b {backend}'] = ['main.py', args.board, '-b', backend]
+    for name, argv in commands.items():
+        seconds, _ = timed(lambda: subprocess.run([sys.executable, *argv], cwd=directory, stdin=subprocess.DEVNULL,
+                                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL), args.runs)
+        imported = imported_modules(argv, directory)
+        print(f"startup\t{name}\t{seconds:.4f} s\t{', '.join(m for m in heavy if m in imported) or '-'}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gem Hunter solver benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parallel = commands.add_parser('parallel', help='thread portfolio vs process portfolio for cdcl')
+    parallel.add_argument('inputs', nargs='*', default=['testcases/test1.txt', 'testcases/test2.txt', 'random:60'])
+    parallel.add_argument('--workers', type=int, default=4)
+    parallel.add_argument('--runs', type=int, default=3)
+    parallel.add_argument('--seed', type=int, default=0)
+    parallel.set_defaults(run=bench_parallel)
+
+    preprocess = commands.add_parser('preprocess', help='formula reduction and time saved by the Preprocessor')
+    preprocess.add_argument('inputs', nargs='*', default=['testcases/test1.txt', 'testcases/test3.txt', 'random:60'])
+    preprocess.add_argument('--runs', type=int, default=3)
+    preprocess.add_argument('--seed', type=int, default=0)
+    preprocess.add_argument('--pysat-solver', default='g4')
+    preprocess.set_defaults(run=bench_preprocess)
+
+    local_search = commands.add_parser('local-search', help='local search vs complete solvers on generated boards')
+    local_search.add_argument('sizes', nargs='*', default=['50x50', '100x100', '200x200'])
+    local_search.add_argument('--density', type=float, default=0.15)
+    local_search.add_argument('--reveal', type=float, default=0.5)
+    local_search.add_argument('--time-limit', type=float, default=30.0)
+    local_search.add_argument('--seed', type=int, default=0)
+    local_search.set_defaults(run=bench_local_search)
+
+    tiled = commands.add_parser('tiled', help='peak memory of the tiled solver vs the whole board')
+    tiled.add_argument('sizes', nargs='*', default=['1000x100', '4000x100'])
+    tiled.add_argument('--bands', type=int, nargs='+', default=[16, 64, 256])
+    tiled.add_argument('--halo', type=int, default=4)
+    tiled.add_argument('--density', type=float, default=0.15)
+    tiled.add_argument('--reveal', type=float, default=0.5)
+    tiled.add_argument('--seed', type=int, default=0)
+    tiled.add_argument('--directory', default='.', help='where the generated boards are written')
+    tiled.set_defaults(run=bench_tiled)
+
+    startup = commands.add_parser('startup', help='startup time and imported solver modules of short-lived runs')
+    startup.add_argument('--board', default='testcases/test4.txt')
+    startup.add_argument('--backends', nargs='+', default=['pysat', 'cdcl', 'backtracking', 'localsearch'])
+    startup.add_argument('--runs', type=int, default=5)
+    startup.set_defaults(run=bench_startup)
+
+    args = parser.parse_args()
+    args.run(args)
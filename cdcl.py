@@ -1,5 +1,10 @@
 import numpy as np  # using np.array is more computationally efficient when there is no expansion
 from dataclasses import dataclass   # class now is like struct in C++ (simpler and just for data grouping)
+from Instrumentation import NULL_STATS
+from Budget import Budget, CancelToken, UNLIMITED, BudgetExceeded, STATUS_SAT, STATUS_UNSAT, STATUS_UNKNOWN
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 @dataclass(frozen=True)
 class Literal:
@@ -109,6 +114,15 @@ class CNF:
         # iterating an CNF formula is iterating its list of Clauses
         return iter(self.clauses)
 
+    def copy(self) -> 'CNF':
+        """
+            a formula with its own list of clauses (so learnt clauses stay private), sharing the Clause objects
+        """
+        other = CNF.__new__(CNF)
+        other.clauses = list(self.clauses)
+        other.variables = self.variables
+        return other
+
 class Assignment:
     variable: int
     value: bool
@@ -157,23 +171,64 @@ class Assignments(dict):
         return bool(self.get(variable))
 
 class CDCL:
-    _current_dl = 0     # keep current decision level when processing
+    """
+        one run of the CDCL algorithm on a CNF formula.
+        All the solver state (decision level, counters, random generator) lives in the instance, so several
+        instances can run at the same time on different threads.
+    """
+    HEURISTICS = ('random', 'occurrence', 'ordered')
 
-    @staticmethod
-    def __resolution_operation(
-        this: Clause,
-        that: Clause,
-        var: int
-    ):
+    def __init__(
+        self,
+        cnf: CNF,
+        seed: int = None,
+        heuristic: str = 'random',
+        budget=UNLIMITED,
+        pool=None
+    ) -> None:
         """
-            apply resolution operation on 2 clause and returns the resulted clause
+            - cnf: the formula; learnt clauses are appended to it
+            - seed: seed of the random generator used to pick branching variables/values
+            - heuristic: how to pick the branching variable (see __pick_branching_variable)
+            - budget: a Budget checked on every decision, conflict and propagation pass
+            - pool: an optional LearntClausePool to exchange short learnt clauses with other instances
         """
-        res = set(np.append(this.literals, that.literals)) - { Literal(var, True), Literal(var, False) }
-        return Clause( literals=list(res) )
+        if heuristic not in CDCL.HEURISTICS:
+            raise ValueError(f'unknown heuristic {heuristic!r}, expected one of {CDCL.HEURISTICS}')
+        self._cnf = cnf
+        self._rng = random.Random(seed)
+        self._heuristic = heuristic
+        self._budget = budget
+        self._pool = pool
+        self._pool_cursor = 0   # number of pool clauses already seen by this instance
+        self._current_dl = 0    # keep current decision level when processing
+        self._trail = []        # assigned variables in assignment order (so decision levels never decrease along it)
+        # per-variable marks of conflict analysis, always all zero between two analyses
+        max_var = int(max(cnf.variables)) if len(cnf.variables) else 0
+        self._seen = bytearray(max_var + 1)
+        # counters of the current solve, reported through report_counters()
+        self._decisions = 0
+        self._propagations = 0
+        self._conflicts = 0
+        self._learnt_clauses = 0
+        self._imported_clauses = 0
+        self._learnt_literals = 0
+        self._minimized_literals = 0
+        self._lbd_sum = 0
+        if heuristic == 'random':
+            self._order = None
+        elif heuristic == 'occurrence':
+            # most constrained variables first, ties broken by the seed
+            occurrences = {}
+            for clause in cnf:
+                for lit in clause:
+                    occurrences[lit.variable] = occurrences.get(lit.variable, 0) + 1
+            self._order = sorted(occurrences, key=lambda var: (-occurrences[var], self._rng.random()))
+        else:
+            self._order = sorted(int(var) for var in cnf.variables)
 
-    @staticmethod
     def __unit_propagation(
-        cnf: CNF,
+        self,
         assignments: Assignments
     ):
         """
@@ -187,16 +242,13 @@ class CDCL:
         finished = False
         while not finished:
             # keep going until no unit clause remains
+            self._budget.check(conflicts=self._conflicts)    # a pass over a big formula is slow, stay responsive
             finished = True
-            for clause in cnf:
+            for clause in self._cnf:
                 status, id = clause.status(assignments=assignments)
                 if status == 'unit': # is unit clause
                     # get the unassigned variables in the unit clause
                     unassigned_literal = clause[id]
-                    # print(unassigned_literal)
-                    # unassigned_literal = next(lit for lit in clause if not assignments.check_existence(lit.variable))
-                    # print(unassigned_literal)
-                    # print('------------')
                     var = unassigned_literal.variable
                     val = not unassigned_literal.negation   # make the literal satisfied (True)
 
@@ -204,8 +256,10 @@ class CDCL:
                         variable=var,
                         value=val,
                         antecedent=clause,
-                        dl=CDCL._current_dl
+                        dl=self._current_dl
                     )
+                    self._trail.append(var)
+                    self._propagations += 1
                     finished = False # continue outter while loop
                 elif status == 'unsatisfied':
                     # conflict
@@ -213,136 +267,215 @@ class CDCL:
                 else:
                     continue
         return ('unresolved', None)
-    
-    @staticmethod
+
     def __check_all_variables_assigned(
-        cnf: CNF,
+        self,
         assignments: Assignments
-    ): 
-        return len(assignments) == len(cnf.variables)
+    ):
+        return len(assignments) == len(self._cnf.variables)
 
-    @staticmethod
     def __pick_branching_variable(
-        cnf: CNF,
+        self,
         assignments: Assignments
     ) -> tuple[int, bool]:
         """
             pick a branching variable and its value
+            - 'random': any unassigned variable, random value
+            - 'occurrence': the unassigned variable occurring in most clauses, False first (most cells are gems)
+            - 'ordered': the smallest unassigned variable, random value
 
             returns: (var, val)
             - var: an unassigned variable
             - val: a boolean value for this var (True | False)
         """
-        unassigned_vars = [var for var in cnf.variables if not assignments.check_existence(var)]
-        import random
-        var = random.choice(unassigned_vars)
-        val = random.choice( [True, False] )
-        return (var, val)
+        if self._order is None:
+            unassigned_vars = [var for var in self._cnf.variables if not assignments.check_existence(var)]
+            return (int(self._rng.choice(unassigned_vars)), self._rng.choice( [True, False] ))
+        var = next(var for var in self._order if not assignments.check_existence(var))
+        if self._heuristic == 'occurrence':
+            return (var, False)
+        return (var, self._rng.choice( [True, False] ))
 
-    @staticmethod
     def __conflict_analysis(
+        self,
         conflict_clause: Clause,
         assignments: Assignments
     ):
         """
             When a conflict occurs due to unit propagation, we invoke conflict analysis to choose a decision level to go back, instead of normally backtracking. This process differs CDCL from DPLL.
 
-            Conflict analysis following the formula given in this site: https://kienyew.github.io/CDCL-SAT-Solver-from-Scratch/The-Theory.html#exploiting-structure-with-uips
-            Conflict analysis is to find a set of clauses that caused the conflict (antecedents). What we do is to traverse the implication graph backwards, 
-            returns (b, clause):
+            First-UIP learning (see https://kienyew.github.io/CDCL-SAT-Solver-from-Scratch/The-Theory.html#exploiting-structure-with-uips),
+            done in one backward walk over the trail instead of rebuilding intermediate clauses:
+            - every literal met in the conflict clause and in the antecedents is marked in `self._seen`,
+            - literals of lower decision levels go into the learnt clause, literals of the current level are counted,
+            - the walk goes back along the trail to the next marked variable and resolves with its antecedent,
+              until a single current-level literal remains: it is the first UIP.
+            Level-0 literals are always false and are left out. The learnt clause is then minimized (see __redundant).
+            returns (b, clause, lbd):
                 - b: decision level to go back when do backtracking
-                - clause: the new learnt clause to be added to the KB (cnf)  
+                - clause: the new learnt clause to be added to the KB (cnf)
+                - lbd: number of distinct decision levels in the clause (literal block distance)
         """
-        if CDCL._current_dl == 0:
-            return -1, None
-        # call it "clause" in general; this is the intermediate clause when processing
+        if self._current_dl == 0:
+            return -1, None, 0
+        seen = self._seen
+        learnt = []         # literals of lower decision levels
+        pending = 0         # marked literals of the current level not yet resolved
+        index = len(self._trail) - 1
         clause = conflict_clause
+        var = None
+        while True:
+            for lit in clause:
+                v = lit.variable
+                if v == var or seen[v]:
+                    continue
+                level = assignments[v].decision_level
+                if level == 0:
+                    continue
+                seen[v] = 1
+                if level == self._current_dl:
+                    pending += 1
+                else:
+                    learnt.append(lit)
+            # next marked variable on the trail
+            while not seen[self._trail[index]]:
+                index -= 1
+            var = self._trail[index]
+            index -= 1
+            seen[var] = 0
+            pending -= 1
+            if pending == 0:
+                break
+            clause = assignments[var].antecedent
+
+        # `var` is the first UIP: its literal is false under the current assignment
+        uip = Literal(variable=var, negation=assignments[var].value)
+        self._learnt_literals += len(learnt) + 1
+
+        # recursive minimization: drop literals implied by the other literals of the clause
+        marked = [lit.variable for lit in learnt]
+        kept = [lit for lit in learnt
+                if assignments[lit.variable].antecedent is None or not self.__redundant(lit.variable, assignments, marked)]
+        self._minimized_literals += len(learnt) - len(kept)
+        for v in marked:
+            seen[v] = 0
+
+        # backjump to the deepest level among the other literals; LBD counts the levels of the whole clause
+        levels = {assignments[lit.variable].decision_level for lit in kept}
+        back_lv = max(levels) if levels else 0
+        lbd = len(levels) + 1
+        return back_lv, Clause( literals=[uip] + kept ), lbd
+
+    def __redundant(
+        self,
+        var: int,
+        assignments: Assignments,
+        marked: list
+    ) -> bool:
+        """
+            a learnt literal is redundant if every other literal of its antecedent is in the learnt clause,
+            assigned at level 0, or (recursively) redundant itself. Variables proven redundant stay marked
+            in `self._seen` (and are added to `marked`) so that they are not explored again.
+        """
+        seen = self._seen
+        stack = [var]
+        added = []
+        while stack:
+            antecedent = assignments[stack.pop()].antecedent
+            for lit in antecedent:
+                v = lit.variable
+                if seen[v] or assignments[v].decision_level == 0:
+                    continue
+                if assignments[v].antecedent is None:
+                    # reached a decision that is not in the clause: not redundant, undo the marks of this call
+                    for u in added:
+                        seen[u] = 0
+                    return False
+                seen[v] = 1
+                added.append(v)
+                stack.append(v)
+        marked.extend(added)
+        return True
 
-        # get literals assigned at current decision level and must have antecedent (as intermediate clause will be resolved with antecedents)
-        literals = [lit for lit in clause if (assignments[lit.variable].decision_level == CDCL._current_dl)]
-
-        # constantly resolve each lit in literals with the latest intermediate clause in the list
-        # NOTE: new intermediate literals can be added to the above literal list.
-        while len(literals) != 1: # stop at the first UIP, where number of literals assigned at decision level dl equals to 1
-            lit = next(lit for lit in literals if (assignments[lit.variable].antecedent != None))
-            antecedent = assignments[lit.variable].antecedent
-
-            # w(n) = w(n-1) resolve (antecedent of lit)
-            clause = CDCL.__resolution_operation(clause, antecedent, lit.variable)
-            
-            # as `clause` may have changed so that we need to reconstruct list of literals
-            literals = [lit for lit in clause if assignments[lit.variable].decision_level == CDCL._current_dl]
-        
-        # after all, `clause` is the latest intermediate clause, which is the new learnt clause
-        # compute backtrack level:
-        # - the deepest assignment level of literals in the clause is current
-        decision_levels = sorted( set(assignments[lit.variable].decision_level for lit in clause) )
-        if len(decision_levels) <= 1:
-            return 0, clause
-        return decision_levels[-2], clause  # back to the second last decision that cause the conflict
-
-    @staticmethod
     def __backtrack(
+        self,
         assignments: Assignments,
         back_lv: int
     ) -> None:
         """
-            backtrack to the decision level `back_lv`, unassign what happened at deeper levels
+            backtrack to the decision level `back_lv`, unassign what happened at deeper levels (the end of the trail)
         """
-        rm_var_list = []
-        for var, assignment in assignments.items():
-            if assignment.decision_level > back_lv:
-                rm_var_list.append(var)
-        
-        for var in rm_var_list:
-            assignments.unassign(variable=var)
+        trail = self._trail
+        while trail and assignments[trail[-1]].decision_level > back_lv:
+            assignments.unassign(variable=trail.pop())
 
-    @staticmethod
     def __add_new_clause(
-        cnf: CNF,
-        new_clause: Clause
+        self,
+        new_clause: Clause,
+        lbd: int
     ) -> None:
         """
-            add the new learnt clause to the input CNF formula
+            add the new learnt clause to the input CNF formula, and share it if it is short or has a small LBD
         """
-        cnf.clauses.append(new_clause)
-
+        self._cnf.clauses.append(new_clause)
+        self._learnt_clauses += 1
+        self._lbd_sum += lbd
+        if self._pool is not None:
+            self._pool.export(self, new_clause, lbd)
+
+    def __import_shared_clauses(
+        self,
+        assignments: Assignments
+    ) -> bool:
+        """
+            restart at decision level 0 and add the clauses learnt by other instances since the last import.
+            Shared clauses are implied by the formula, so adding them at level 0 is always sound.
+            returns False if there was nothing to import
+        """
+        clauses, self._pool_cursor = self._pool.collect(self, self._pool_cursor)
+        if not clauses:
+            return False
+        self.__backtrack(assignments=assignments, back_lv=0)
+        self._current_dl = 0
+        self._cnf.clauses.extend(clauses)
+        self._imported_clauses += len(clauses)
+        return True
 
-    @staticmethod
     def __CDCL(
-        cnf: CNF,
+        self,
         assignments: Assignments
     ) -> Assignments:
         """
-            run CDCL algorithm to solve the given CNF formula
-            input: cnf formula, a dict `assignments` that will contain all assignments
+            run CDCL algorithm to solve the formula of this instance
+            input: a dict `assignments` that will contain all assignments
             returns the final assignments for all of variables in the formula; or None
+            raises BudgetExceeded when the budget runs out
         """
-        status, clause = CDCL.__unit_propagation(
-            cnf=cnf,
+        status, clause = self.__unit_propagation(
             assignments=assignments
         )
         if status == "conflict":
             return None
 
-        CDCL._current_dl = 0    # decision level: current depth
-        while not CDCL.__check_all_variables_assigned(cnf=cnf,assignments=assignments):
-            var, val = CDCL.__pick_branching_variable(
-                cnf=cnf,
+        self._current_dl = 0    # decision level: current depth
+        while not self.__check_all_variables_assigned(assignments=assignments):
+            self._budget.check(conflicts=self._conflicts)
+            var, val = self.__pick_branching_variable(
                 assignments=assignments
             )
 
-            CDCL._current_dl += 1
+            self._current_dl += 1
+            self._decisions += 1
 
             assignments.assign(
                 variable=var,
                 value=val,
                 antecedent=None,
-                dl=CDCL._current_dl
+                dl=self._current_dl
             )
+            self._trail.append(var)
             while True:
-                status, clause = CDCL.__unit_propagation(
-                    cnf=cnf,
+                status, clause = self.__unit_propagation(
                     assignments=assignments
                 )
 
@@ -351,66 +484,211 @@ class CDCL:
                     break # assign more variables
                 
                 # a conflict occurs with current set of assignments
+                self._conflicts += 1
+                self._budget.check(conflicts=self._conflicts)
                 # analyse the conflict
-                b, new_clause = CDCL.__conflict_analysis(
+                b, new_clause, lbd = self.__conflict_analysis(
                     conflict_clause=clause,
                     assignments=assignments
                 )
 
                 if b < 0:
-                    print("b < 0")
                     return None
                 else:
-                    CDCL.__add_new_clause(
-                        cnf=cnf,
-                        new_clause=new_clause
+                    self.__add_new_clause(
+                        new_clause=new_clause,
+                        lbd=lbd
                     )
-                    CDCL.__backtrack(
+                    self.__backtrack(
                         assignments=assignments,
                         back_lv=b
                     )
-                    CDCL._current_dl = b
+                    self._current_dl = b
+                    if self._pool is not None and self._conflicts % self._pool.import_interval == 0:
+                        self.__import_shared_clauses(assignments=assignments)
         return assignments
 
-    @staticmethod
-    def solve(cnf: CNF):
+    def solve(self):
+        """
+            returns the final assignments, or None if the formula is unsatisfiable
+            raises BudgetExceeded when the budget runs out
+        """
         assignments = Assignments()
-        return CDCL.__CDCL(cnf=cnf, assignments=assignments)
+        self._current_dl = 0
+        self._trail = []
+        self._decisions = self._propagations = self._conflicts = self._learnt_clauses = self._imported_clauses = 0
+        self._learnt_literals = self._minimized_literals = self._lbd_sum = 0
+        self._budget.start()
+        return self.__CDCL(assignments=assignments)
+
+    def report_counters(self, stats) -> None:
+        """
+            report the counters of the last solve to a SolveStats object
+        """
+        stats.count('decisions', self._decisions)
+        stats.count('propagations', self._propagations)
+        stats.count('conflicts', self._conflicts)
+        stats.count('learnt_clauses', self._learnt_clauses)
+        stats.count('learnt_literals', self._learnt_literals - self._minimized_literals)
+        stats.count('minimized_literals', self._minimized_literals)
+        stats.count('learnt_lbd_sum', self._lbd_sum)
+        if self._pool is not None:
+            stats.count('imported_clauses', self._imported_clauses)
+
+class LearntClausePool:
+    """
+        learnt clauses shared between CDCL instances running on threads.
+        Only clauses with at most `max_length` literals or an LBD of at most `max_lbd` are shared: they are the most useful.
+    """
+    def __init__(self, max_length: int = 3, import_interval: int = 32, max_lbd: int = 2) -> None:
+        """
+            - max_length: longest learnt clause that is always shared
+            - import_interval: an instance imports the new shared clauses every `import_interval` conflicts
+            - max_lbd: learnt clauses with an LBD up to this are shared whatever their length
+        """
+        self.max_length = max_length
+        self.max_lbd = max_lbd
+        self.import_interval = import_interval
+        self._lock = threading.Lock()
+        self._clauses = []  # list of (owner, Clause)
+
+    def export(self, owner: CDCL, clause: Clause, lbd: int) -> None:
+        if len(clause.literals) <= self.max_length or lbd <= self.max_lbd:
+            with self._lock:
+                self._clauses.append((owner, clause))
+
+    def collect(self, reader: CDCL, cursor: int) -> tuple[list, int]:
+        """
+            returns the clauses added after position `cursor` by other instances, and the new cursor
+        """
+        with self._lock:
+            new = self._clauses[cursor:]
+            cursor = len(self._clauses)
+        return [clause for owner, clause in new if owner is not reader], cursor
 
 class Solver:
     __cnf: CNF  # the CNF formula to be solved
-    def __init__(self, clauses: list[list[int]]) -> None:
-        self.__variables = []
-        for clause in clauses:
-            for lit in clause:
-                var = abs(lit)
-                if var not in self.__variables:
-                    self.__variables.append( var )
-        
+    status: str # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN (budget exceeded) after solve(); None before
+    def __init__(self, clauses: list[list[int]], seed: int = None, heuristic: str = 'random') -> None:
+        """
+            - clauses: list of clauses, e.g. [[-1,2,3], [-1,3,-5], [-5]]
+            - seed, heuristic: see CDCL
+        """
+        self.status = None
+        self.__seed = seed
+        self.__heuristic = heuristic
+        # dict keeps the order of first occurrence and makes the lookup O(1)
+        self.__variables = list(dict.fromkeys(abs(lit) for clause in clauses for lit in clause))
         self.__cnf = CNF( clauses=clauses, variables=self.__variables )
 
-    def solve(self):
+    @staticmethod
+    def model(final_assignments: Assignments) -> list:
         """
-            invoke CDCL algorithm solver
-
-            returns list of resulted values (e.g., [1,-2,-3,5,9,-7]); or None
+            convert final assignments into a sorted list of literals (e.g., [1,-2,-3,5,9,-7])
         """
-        final_assignments = CDCL.solve(self.__cnf)
-        if final_assignments == None:
-            return None
-        
-        magnitude = []
-        for var, assignment in final_assignments.items():
-            magnitude.append(var)
-        
-        res = sorted(magnitude)
+        res = sorted(final_assignments.keys())
         for i in range(len(res)):
             var = res[i]
             val = final_assignments[var].value
             if val == False:
                 res[i] = -res[i]
-        
         return res
+
+    def solve(self, stats=NULL_STATS, budget=UNLIMITED):
+        """
+            invoke CDCL algorithm solver
+            input:
+                - `stats`, a SolveStats object that receives the solver counters
+                - `budget`, a Budget limiting time/conflicts; when it runs out, `status` is STATUS_UNKNOWN
+
+            returns list of resulted values (e.g., [1,-2,-3,5,9,-7]); or None
+        """
+        cdcl = CDCL(self.__cnf, seed=self.__seed, heuristic=self.__heuristic, budget=budget)
+        try:
+            final_assignments = cdcl.solve()
+        except BudgetExceeded:
+            final_assignments = None
+            self.status = STATUS_UNKNOWN
+        else:
+            self.status = STATUS_UNSAT if final_assignments == None else STATUS_SAT
+        cdcl.report_counters(stats)
+        if final_assignments == None:
+            return None
+        return Solver.model(final_assignments)
+
+class ParallelSolver:
+    """
+        portfolio of diversified CDCL instances (different seeds and heuristics) solving the same formula on a thread pool.
+        Instances share their short learnt clauses through a LearntClausePool; the first one to finish wins and cancels the others.
+        On a free-threaded CPython build the instances really run in parallel; with the GIL they only interleave.
+    """
+    status: str # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN (budget exceeded) after solve(); None before
+    def __init__(self, clauses: list[list[int]], workers: int = 4, seed: int = 0, share_max_length: int = 3) -> None:
+        """
+            - clauses: list of clauses, e.g. [[-1,2,3], [-1,3,-5], [-5]]
+            - workers: number of CDCL instances (and threads)
+            - seed: seed of the first instance; instance k uses seed + k and heuristic CDCL.HEURISTICS[k % 3]
+            - share_max_length: longest learnt clause shared between instances (0 disables sharing)
+        """
+        self.status = None
+        self.__workers = workers
+        self.__seed = seed
+        self.__share_max_length = share_max_length
+        variables = list(dict.fromkeys(abs(lit) for clause in clauses for lit in clause))
+        self.__cnf = CNF( clauses=clauses, variables=variables )
+
+    def solve(self, stats=NULL_STATS, budget=UNLIMITED):
+        """
+            run the portfolio
+            input: see Solver.solve; counters are summed over all instances
+            returns list of resulted values (e.g., [1,-2,-3,5,9,-7]); or None
+        """
+        stop = CancelToken()    # cancels the remaining instances once one has an answer
+        if budget.token is not None:
+            budget.token.on_cancel(stop.cancel)
+        pool = LearntClausePool(max_length=self.__share_max_length) if self.__share_max_length > 0 else None
+        instances = [
+            CDCL(
+                self.__cnf.copy(),
+                seed=self.__seed + k,
+                heuristic=CDCL.HEURISTICS[k % len(CDCL.HEURISTICS)],
+                budget=Budget(budget.time_limit, budget.max_conflicts, budget.max_nodes, token=stop),
+                pool=pool
+            )
+            for k in range(self.__workers)
+        ]
+
+        def run(cdcl: CDCL):
+            try:
+                return cdcl.solve()
+            except BudgetExceeded:
+                return STATUS_UNKNOWN
+
+        final_assignments = STATUS_UNKNOWN
+        try:
+            with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+                futures = [executor.submit(run, cdcl) for cdcl in instances]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if result is not STATUS_UNKNOWN:
+                            final_assignments = result
+                            break
+                finally:
+                    stop.cancel()   # the executor waits for every thread on exit
+        finally:
+            if budget.token is not None:
+                budget.token.remove_callback(stop.cancel)
+        for cdcl in instances:
+            cdcl.report_counters(stats)
+        if final_assignments is STATUS_UNKNOWN:
+            self.status = STATUS_UNKNOWN
+            return None
+        if final_assignments is None:
+            self.status = STATUS_UNSAT
+            return None
+        self.status = STATUS_SAT
+        return Solver.model(final_assignments)
     
 if __name__ == "__main__":
     """
@@ -1,92 +1,261 @@
-import cdcl
-from BoardCNF import BoardCNF
-import PySAT
-import BruteForce_Backtrack
-import copy # For deep copy of the board to store the result of the solution
+import argparse
+import sys
+import Backends
+import BoardBinary
+from BoardCNF import BoardCNF, ENCODINGS
+from Verifier import check_solution, InvalidSolution
+from BoardParser import parse_board, format_board, grid_from_rows
+from Instrumentation import NULL_STATS, SolveStats
+from Budget import Budget, UNLIMITED, STATUS_SAT, STATUS_UNKNOWN
 
 # -------------Documentation-----------------
 """
 The GemHunter class is responsible for reading the input file, generating the board, and solving the puzzle using different methods.
-The gen_board method reads the input file and generates the board.
-The create_board_result method creates a new board with the solution based on the result list.
-The solve method takes a solve_id as input and calls the corresponding solver method based on the id.
-The main method reads the input file, generates the board, and prompts the user to choose a solving method.
+The gen_board method reads the input file (text or binary, see BoardParser and BoardBinary) into a NumPy grid, which is then passed to every solver.
+The create_board_result method creates a new grid with the solution based on the result list.
+The solve method takes a backend name or number (see Backends) and runs it; the solver modules are only imported when their backend is used.
+Every phase (parse, gen_clauses, construct, solve, decode) and the solver counters are reported to the SolveStats object given to the constructor (see Instrumentation).
+The encoding argument of solve selects the BoardCNF encoding ('full' or the smaller 'dense').
+With preprocess=True, the clauses go through the Preprocessor before the SAT solvers and the model is extended back to every cell.
+Local search (backend 5) hands the clauses to PySAT (Glucose 4) when it fails, unless fallback=False.
+solve also takes a Budget (time/conflict/node limits and a cancel token); when it runs out, status becomes STATUS_UNKNOWN instead of the solve hanging.
+Every solution is checked against the board (see Verifier) before it is accepted: a wrong one raises InvalidSolution.
+The solve_tiled method solves a text board too large for memory band by band (see TiledSolver), writing the solution as it goes.
+Run with arguments, main.py solves a board without asking anything (see `python main.py --help`);
+without arguments it reads the input file and prompts the user to choose a solving method.
 **Note: THE BOARD ALLOWS FOR A RECTANGULAR SHAPE, NOT JUST SQUARE.
 """
 
 class GemHunter:
-    def __init__(self):
-        self.board = []
+    def __init__(self, stats=NULL_STATS):
+        self.stats = stats  # SolveStats receiving timings and counters
+        self.board = None  # n x m int8 grid of cell codes
         self.n = 0  # Number of rows
         self.m = 0  # Number of columns
-        self.res_board = None
+        self.res_board = None  # solved grid, or None
+        self.status = None  # STATUS_SAT, STATUS_UNSAT or STATUS_UNKNOWN after solve()
+        self.reason = None  # with STATUS_UNKNOWN: 'time', 'conflicts', 'nodes', 'cancelled', 'conflict' (tiled) or None
 
     def gen_board(self, filepath):
         self.res_board = None
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                row = line.strip().split(', ') # Split the row by ', '
-                self.board.append(row)
-                self.n += 1  # Number of rows
-                self.m = len(row)  # Number of columns
-
-    def create_board_result(self, result_list):
-        self.res_board = copy.deepcopy(self.board)
-        for i in range(self.n):
-            for j in range(self.m):
-                if self.res_board[i][j] == '_':
-                    if result_list[(i * self.m + j)] > 0:  # (i * self.m + j) is the index of the variable in the model
-                        self.res_board[i][j] = 'T' 
-                    else:
-                        self.res_board[i][j] = 'G'
-
-    def solve(self, solve_id: int, input_file: str):
-        board_cnf = BoardCNF(self.board, self.n, self.m)
-        #print('Input:')
-        #print('\n'.join([', '.join(row) for row in self.board]))
-        clauses = board_cnf.gen_clauses()
-        if solve_id == 1:
-            solver_name = input('Please enter the name of a PySAT solver (g4, g3, m22, etc): ')
-            pysat_solver = PySAT.PySatSolver(clauses, solver_name)
-            pysat_res = pysat_solver.solve()
-            if pysat_res:
-                self.create_board_result(pysat_res)
-        elif solve_id == 2:
-            cdcl_solver = cdcl.Solver(clauses)
-            cdcl_res = cdcl_solver.solve()
-            if cdcl_res:
-                self.create_board_result(cdcl_res)
-        if solve_id == 3:
-            # print('Using Backtracking:')
-            backtracking = BruteForce_Backtrack.Backtracking()
-            solution = backtracking.run(input_file)
-            if solution:
-                self.res_board = solution
-        elif solve_id == 4:
-            # print('Using Brute Force:')
-            brute_force = BruteForce_Backtrack.BruteForce()
-            solution = brute_force.run(input_file)
+        with self.stats.phase('parse'):
+            if BoardBinary.is_binary(filepath):
+                self.board = BoardBinary.load_board(filepath)
+            else:
+                self.board = parse_board(filepath) # Raises ValueError on an invalid board
+        self.n, self.m = self.board.shape
+
+    def create_board_result(self, result_list, board_cnf=None):
+        if board_cnf is None:   # variables numbered as in the 'full' encoding
+            board_cnf = BoardCNF(self.board, self.n, self.m)
+        self.res_board = BoardBinary.apply_solution(self.board, board_cnf.trap_mask(result_list))
+
+    def solve_tiled(self, filepath, output, band: int = 64, halo: int = 4, solver_name: str = 'g4', budget=UNLIMITED):
+        """stream the text board `filepath` and write its solution to the binary file `output`, the board is never loaded whole"""
+        from TiledSolver import TiledSolver
+        self.board = self.res_board = None
+        tiled = TiledSolver(band, halo, solver=solver_name)
+        self.status = tiled.solve_file(filepath, output, self.stats, budget)
+        self.reason = tiled.reason
+        return self.status
+
+    def solve(self, solve_id, budget=UNLIMITED, encoding: str = 'full', preprocess: bool = False,
+              fallback: bool = True, options: dict = None):
+        """
+            solve_id: name or number of a backend (see Backends)
+            options are given to the backend (e.g. {'solver_name': 'g4'} for PySAT, {'algorithm': 'walksat'} for local search)
+        """
+        backend = Backends.get(solve_id)
+        stats = self.stats
+        self.res_board = None
+        if backend.kind == 'grid':
+            with stats.phase('construct'):
+                solver = backend.create(options=options)
+            with stats.phase('solve'):
+                solution = solver.run(self.board, stats, budget)
+            self.status = solver.status
             if solution:
-                self.res_board = solution
+                with stats.phase('decode'):
+                    self.res_board = grid_from_rows(solution)
+        else:
+            preprocessor = None
+            with stats.phase('gen_clauses'):
+                board_cnf = BoardCNF(self.board, self.n, self.m, encoding)
+                clauses = board_cnf.gen_clauses()
+            stats.count('clauses', len(clauses))
+            if preprocess:
+                from Preprocessor import Preprocessor
+                with stats.phase('preprocess'):
+                    preprocessor = Preprocessor(clauses)
+                    clauses = preprocessor.run()
+                stats.count('reduced_clauses', len(clauses))
+            with stats.phase('construct'):
+                solver = backend.create(clauses, options)
+            with stats.phase('solve'):
+                model = solver.solve(stats, budget)
+            self.status = solver.status
+            if (model is None and self.status == STATUS_UNKNOWN and fallback and backend.fallback is not None
+                    and budget.reason not in ('time', 'cancelled')):
+                # an incomplete backend cannot prove anything: let a complete solver decide
+                budget = budget.remainder()   # no fresh time limit, and the reason is the one of the fallback
+                with stats.phase('fallback'):
+                    fallback_solver = Backends.get(backend.fallback).create(clauses)
+                    model = fallback_solver.solve(stats, budget)
+                self.status = fallback_solver.status
+                stats.count('fallbacks', 1)
+            if model is not None:
+                with stats.phase('decode'):
+                    if preprocessor is not None:
+                        model = preprocessor.extend_model(model)
+                    self.create_board_result(model, board_cnf)
+        # budgets polled by the solver know why they ran out, the deadline and token of the others are checked here
+        self.reason = budget.reason if self.status == STATUS_UNKNOWN and (budget.reason or budget.exceeded()) else None
+        if self.res_board is not None:
+            with stats.phase('verify'):
+                result, self.res_board = self.res_board, None
+                check_solution(self.board, result) # Raises InvalidSolution on a wrong model
+                self.res_board = result
 
 
-if __name__ == '__main__':
+
+def gave_up_message(reason) -> str:
+    """why a solve ended with STATUS_UNKNOWN"""
+    if reason == 'conflict':
+        return 'Gave up: the rows already written cannot be extended (try a larger --band or --halo).'
+    if reason is not None:
+        return f'Gave up: the solving budget was exceeded ({reason}).'
+    return 'Gave up: the solver stopped without an answer.'
+
+
+def interactive():
     print('-----------------Gem Hunter-----------------')
     gem_hunter = GemHunter()
     input_file = input('Enter the input file path: ')
-    gem_hunter.gen_board(input_file)
+    try:
+        gem_hunter.gen_board(input_file)
+    except ValueError as e:
+        print(f'Invalid board: {e}')
+        exit(1)
     print('Solver options:')
-    print("1. PySAT")
-    print("2. CDCL (self implementation)")
-    print("3. Backtracking algorithm")
-    print("4. Brute-force algorithm")
-    solver = int(input('Please choose a solving method (1-4): '))
-    gem_hunter.solve(solver, input_file)
+    backends = Backends.available()
+    for backend in backends:
+        print(f'{backend.solve_id}. {backend.description}')
+    backend = Backends.get(input(f'Please choose a solving method (1-{len(backends)}): ').strip())
+    options = None
+    if backend.name == 'pysat':
+        options = {'solver_name': input('Please enter the name of a PySAT solver (g4, g3, m22, etc): ')}
+    try:
+        gem_hunter.solve(backend.name, options=options)
+    except InvalidSolution as e:
+        print(f'\nThe solver returned an invalid solution: {e}')
+        exit(1)
     result = gem_hunter.res_board
-    if result:
+    if result is not None:
         print('\nSolution:')
-        for row in result:
-            print(', '.join(row))
+        sys.stdout.flush()
+        sys.stdout.buffer.write(format_board(result))
+    elif gem_hunter.status == STATUS_UNKNOWN:
+        print(f'\n{gave_up_message(gem_hunter.reason)}')
     else:
         print('\nNo solution found.')
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Solve a Gem Hunter board.',
+                                     epilog='Without any argument, the board and the solver are asked interactively.')
+    parser.add_argument('board', nargs='?', help='board file (text or binary)')
+    parser.add_argument('-b', '--backend', default='pysat', help=f'backend name or number: {", ".join(Backends.names())}')
+    parser.add_argument('-e', '--encoding', choices=ENCODINGS, default='full', help='CNF encoding of the SAT backends')
+    parser.add_argument('--preprocess', action='store_true', help='simplify the clauses before the SAT backends')
+    parser.add_argument('--no-fallback', action='store_true', help='do not hand the clauses to PySAT when local search fails')
+    parser.add_argument('-o', '--output', help='write the solution to this file instead of the standard output')
+    parser.add_argument('-f', '--format', choices=('text', 'binary'), default='text',
+                        help='format of the solution: the solved board as text, or a binary solution file '
+                             '(trap bits, see BoardBinary; needs --output)')
+    parser.add_argument('--stats', action='store_true', help='print phase timings and solver counters to stderr')
+    parser.add_argument('--list-backends', action='store_true', help='list the backends and their options, then exit')
+    limits = parser.add_argument_group('budget')
+    limits.add_argument('--time-limit', type=float, help='seconds')
+    limits.add_argument('--max-conflicts', type=int, help='conflicts of the CDCL backends')
+    limits.add_argument('--max-nodes', type=int, help='search nodes / candidates / flips')
+    backend_options = parser.add_argument_group('backend options (see --list-backends for the backends accepting them)')
+    for name, (kind, description) in Backends.options().items():
+        backend_options.add_argument('--' + name.replace('_', '-'), type=kind, help=description)
+    tiled = parser.add_argument_group('tiled mode (text boards larger than memory, PySAT on every band)')
+    tiled.add_argument('--tiled', action='store_true', help='stream the board band by band, the solution is written as it goes')
+    tiled.add_argument('--band', type=int, default=64, help='rows committed per band')
+    tiled.add_argument('--halo', type=int, default=4, help='extra rows solved after every band')
+    args = parser.parse_args(argv)
+    if args.board is None and not args.list_backends:
+        parser.error('the board file is required')
+    if args.format == 'binary' and (args.output is None or args.tiled):
+        parser.error('--format binary needs --output and cannot be used with --tiled')
+    if args.tiled:
+        ignored = [name for name in Backends.options() if name != 'solver_name' and getattr(args, name) is not None]
+        if ignored:
+            parser.error(f'--tiled runs PySAT on every band and only accepts --solver-name, not {ignored}')
+    return args
+
+
+def command_line(argv: list) -> int:
+    """
+        solve the board given on the command line
+        returns the exit code: 0 if a solution was written, 1 otherwise
+    """
+    args = parse_arguments(argv)
+    if args.list_backends:
+        for backend in Backends.available():
+            print(f'{backend.solve_id}. {backend.name}: {backend.description}')
+            for name, (kind, description) in backend.options.items():
+                print(f'    --{name.replace("_", "-")} {kind.__name__}: {description}')
+        return 0
+    stats = SolveStats() if args.stats else NULL_STATS
+    budget = UNLIMITED
+    if args.time_limit is not None or args.max_conflicts is not None or args.max_nodes is not None:
+        budget = Budget(time_limit=args.time_limit, max_conflicts=args.max_conflicts, max_nodes=args.max_nodes)
+    gem_hunter = GemHunter(stats)
+    try:
+        if args.tiled:
+            output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+            try:
+                gem_hunter.solve_tiled(args.board, output, args.band, args.halo, args.solver_name or 'g4', budget)
+            finally:
+                if args.output:
+                    output.close()
+        else:
+            backend = Backends.get(args.backend)
+            # every option given goes to the backend, which rejects those it does not accept
+            given = {name: getattr(args, name) for name in Backends.options() if getattr(args, name) is not None}
+            gem_hunter.gen_board(args.board)
+            gem_hunter.solve(backend.name, budget, args.encoding, args.preprocess, not args.no_fallback, given)
+    except (ValueError, OSError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    except InvalidSolution as e:
+        print(f'The solver returned an invalid solution: {e}', file=sys.stderr)
+        return 1
+    finally:
+        if args.stats:
+            print(stats.report(), file=sys.stderr)
+    result = gem_hunter.res_board
+    if result is not None:
+        if args.format == 'binary':
+            BoardBinary.save_solution(args.output, BoardBinary.solution_mask(result))
+        elif args.output:
+            with open(args.output, 'wb') as f:
+                f.write(format_board(result))
+        else:
+            sys.stdout.buffer.write(format_board(result))
+    if gem_hunter.status == STATUS_SAT:
+        return 0
+    if gem_hunter.status == STATUS_UNKNOWN:
+        print(gave_up_message(gem_hunter.reason), file=sys.stderr)
+    else:
+        print('No solution found.', file=sys.stderr)
+    return 1
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(command_line(sys.argv[1:]))
+    interactive()
@@ -1,6 +1,6 @@
 from main import GemHunter
+from Verifier import InvalidSolution
 import time
-import matplotlib.pyplot as plt
 
 FILEPATH = 'testcases/test5.txt'
 
@@ -15,9 +15,7 @@ if __name__ == '__main__':
     game.gen_board(FILEPATH)
     total_avg = [] # average time for each solving method (numbered as in the dict below)
     run = {
-        1: "PySAT", 
-        # FOR THIS TO WORK PROPERLY, YOU NEED TO GO TO main.py AND UNCOMMENT THE LINE 52 (solver_name = input('Please enter the name of a PySAT solver (g4, g3, m22, etc): ')
-        # AND CHANGE THE LINE 53 TO pysat_solver = PySAT.PySatSolver(clauses, solver_name)
+        1: "PySAT", # Glucose 4, pass options={'solver_name': ...} to game.solve for another PySAT solver
         2: "CDCL (self implementation)",
         3: "Backtracking algorithm",
         4: "Brute-force algorithm",
@@ -25,9 +23,13 @@ if __name__ == '__main__':
 
     for type, name in run.items():
         durations = []
+        error = None
         for _ in range(N_runs):
             start = time.time()
-            game.solve(type, FILEPATH)
+            try:
+                game.solve(type)
+            except InvalidSolution as e: # still timed, the wrong solution is reported once below
+                error = e
             end = time.time()
             durations.append( end - start )
         avg = 0
@@ -36,10 +38,13 @@ if __name__ == '__main__':
         avg /= len(durations)
 
         print(f'{name}: {avg} second')
+        if error is not None:
+            print(f'{name} returned an invalid solution: {error}')
         total_avg.append(avg)
         print('-----------------')
         
         
+    import matplotlib.pyplot as plt # only needed for the graph, keeps the import of this file fast
     # line graph
     for v in total_avg:
         plt.plot(run.values(), total_avg, marker='o')